@@ -0,0 +1,308 @@
+import argparse
+import base64
+import contextlib
+import json
+import os
+import platform
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# ----------------------------
+# CONFIG
+# ----------------------------
+
+DEFAULT_VIDEO = os.path.join(os.path.dirname(__file__), "..", "recordings", "session_video.mp4")
+
+CORPUS_FRAMES = 120
+JPEG_QUALITY = 80
+WARMUP_FRAMES = 5           # graph construction, first-frame allocations
+CONCURRENCY = (1, 4, 8)
+
+PERCENTILES = (50, 95, 99)
+
+# ----------------------------
+# CORPUS
+# ----------------------------
+
+def load_corpus(video=DEFAULT_VIDEO, count=CORPUS_FRAMES, size=None):
+    """
+    JPEG-encoded frames from the checked-in recording, or synthetic
+    frames if it is missing. The same bytes are replayed every run.
+    """
+
+    frames = []
+
+    if video and os.path.exists(video):
+        cap = cv2.VideoCapture(video)
+        while len(frames) < count:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frames.append(frame)
+        cap.release()
+
+    source = "video" if frames else "synthetic"
+    if not frames:
+        frames = synthetic_frames(count, size or (640, 480))
+
+    if size:
+        frames = [cv2.resize(f, size, interpolation=cv2.INTER_AREA) for f in frames]
+
+    params = [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]
+    corpus = [cv2.imencode(".jpg", f, params)[1].tobytes() for f in frames]
+
+    return corpus, source
+
+
+def synthetic_frames(count, size):
+    """
+    A fixed-seed gradient with noise and a moving block: no landmarks
+    are found, but decode / convert / every graph still runs.
+    """
+
+    w, h = size
+    rng = np.random.default_rng(0)
+    base = np.tile(np.linspace(40, 200, w, dtype=np.uint8), (h, 1))
+    base = cv2.merge([base, base[::-1], np.full_like(base, 120)])
+
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        frame += rng.integers(0, 8, frame.shape, dtype=np.uint8)
+        x = (i * 7) % (w - 80)
+        cv2.rectangle(frame, (x, h // 3), (x + 80, h // 3 + 120), (30, 60, 90), -1)
+        frames.append(frame)
+
+    return frames
+
+# ----------------------------
+# STATS
+# ----------------------------
+
+def percentiles(values):
+
+    if not values:
+        return None
+
+    p = np.percentile(values, PERCENTILES)
+
+    return {
+        "count": len(values),
+        **{f"p{q}": round(float(v), 3) for q, v in zip(PERCENTILES, p)},
+        "mean": round(float(np.mean(values)), 3),
+    }
+
+# ----------------------------
+# RUNS
+# ----------------------------
+
+def new_session(cs, session_id, every_frame):
+
+    cs.reset_scores(session_id)
+    session = cs.pool.get_session(session_id)
+
+    if every_frame:
+        session.duplicate_filter.threshold = 0
+
+    return session
+
+
+def run_stages(cs, corpus, every_frame):
+    """
+    One session through the legacy base64 entry point; per-stage
+    latencies come from each result's latency_ms.
+    """
+
+    new_session(cs, "bench-stages", every_frame)
+    encoded = [base64.b64encode(b).decode() for b in corpus]
+
+    for frame in encoded[:WARMUP_FRAMES]:
+        cs.process_frame_from_webrtc(frame, "bench-stages")
+
+    stages = {"base64": [], "client_total": []}
+
+    for frame in encoded:
+
+        t0 = time.perf_counter()
+        base64.b64decode(frame)
+        stages["base64"].append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        result = cs.process_frame_from_webrtc(frame, "bench-stages")
+        stages["client_total"].append((time.perf_counter() - t0) * 1000)
+
+        for stage, ms in result.get("latency_ms", {}).items():
+            stages.setdefault(stage, []).append(ms)
+
+    cs.end_session("bench-stages")
+
+    return {stage: percentiles(v) for stage, v in stages.items()}
+
+
+def run_concurrent(cs, corpus, sessions, every_frame):
+    """
+    `sessions` presenters each replaying the corpus from their own
+    thread, like separate browser tabs polling /api/frame.
+    """
+
+    ids = [f"bench-{sessions}-{i}" for i in range(sessions)]
+    for sid in ids:
+        new_session(cs, sid, every_frame)
+        for frame in corpus[:WARMUP_FRAMES]:
+            cs.process_frame_bytes(frame, sid)
+
+    latencies = [[] for _ in ids]
+    start = threading.Barrier(len(ids) + 1)
+
+    def replay(i, sid):
+        start.wait()
+        for frame in corpus:
+            t0 = time.perf_counter()
+            cs.process_frame_bytes(frame, sid)
+            latencies[i].append((time.perf_counter() - t0) * 1000)
+
+    threads = [threading.Thread(target=replay, args=(i, sid)) for i, sid in enumerate(ids)]
+    for t in threads:
+        t.start()
+
+    start.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    for sid in ids:
+        cs.end_session(sid)
+
+    frames = sum(len(l) for l in latencies)
+
+    return {
+        "sessions": sessions,
+        "frames": frames,
+        "seconds": round(elapsed, 3),
+        "fps": round(frames / elapsed, 2),
+        "fps_per_session": round(frames / elapsed / sessions, 2),
+        "latency_ms": percentiles([ms for l in latencies for ms in l]),
+    }
+
+
+def run_eye_modes(cs, corpus, every_frame):
+    """
+    One session per eye mode on the same frames: face mesh cost and
+    eye score, plus how often lite's per-frame eye status agrees with
+    mesh mode's. The first WARMUP_FRAMES build the graphs and are left
+    out of the timings, not the scores.
+    """
+
+    original = cs.EYE_MODE
+    statuses = {}
+    modes = {}
+
+    try:
+        for mode in cs.EYE_MODES:
+            cs.set_eye_mode(mode)
+
+            sid = f"bench-eye-{mode}"
+            new_session(cs, sid, every_frame)
+            results = [cs.process_frame_bytes(frame, sid) for frame in corpus]
+
+            statuses[mode] = [r.get("eye_status") for r in results]
+            timed = [r["latency_ms"] for r in results[WARMUP_FRAMES:] if "latency_ms" in r]
+
+            modes[mode] = {
+                "face_ms": percentiles([ms["face"] for ms in timed if "face" in ms]),
+                "inference_ms": percentiles([ms["inference"] for ms in timed]),
+                "eye_score": cs.compute_scores(sid)["eye"],
+            }
+            cs.end_session(sid)
+    finally:
+        cs.set_eye_mode(original)
+
+    for mode in modes:
+        same = sum(a == b for a, b in zip(statuses[mode], statuses["mesh"]))
+        modes[mode]["status_agreement"] = round(same / len(corpus), 3)
+
+    return {"iris_mesh_every": cs.IRIS_MESH_EVERY, **modes}
+
+
+def run_benchmark(video=DEFAULT_VIDEO, frames=CORPUS_FRAMES, size=None,
+                  concurrency=CONCURRENCY, every_frame=False):
+
+    import camera_server as cs
+    import mediapipe as mp
+
+    # landmark files would only measure the disk
+    cs.LANDMARKS_ENABLED = False
+
+    if every_frame:
+        cs.SCHEDULER_ENABLED = False
+
+    corpus, source = load_corpus(video, frames, size)
+    h, w = cv2.imdecode(np.frombuffer(corpus[0], np.uint8), cv2.IMREAD_COLOR).shape[:2]
+
+    stages = run_stages(cs, corpus, every_frame)
+    concurrent = [run_concurrent(cs, corpus, n, every_frame) for n in concurrency]
+    eye_modes = run_eye_modes(cs, corpus, every_frame)
+
+    return {
+        "config": {
+            "corpus": source,
+            "frames": len(corpus),
+            "frame_size": [w, h],
+            "jpeg_quality": JPEG_QUALITY,
+            "every_frame": every_frame,
+            "inference_mode": cs.INFERENCE_MODE,
+            "eye_mode": cs.EYE_MODE,
+            "scheduler": cs.SCHEDULER_ENABLED,
+            "roi": cs.ROI_ENABLED,
+            "workers": cs.POOL_SIZE,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "opencv": cv2.__version__,
+            "mediapipe": getattr(mp, "__version__", "unknown"),
+            "numpy": np.__version__,
+        },
+        "stages_ms": stages,
+        "concurrency": concurrent,
+        "eye_modes": eye_modes,
+        # latency tuner tier each worker ended on
+        "tiers": [w.tuner.tier["name"] for w in cs.pool.workers],
+    }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Vision pipeline benchmark (JSON output)")
+    parser.add_argument("--video", default=DEFAULT_VIDEO, help="corpus video; synthetic frames if missing")
+    parser.add_argument("--synthetic", action="store_true", help="ignore the video, use synthetic frames")
+    parser.add_argument("--frames", type=int, default=CORPUS_FRAMES)
+    parser.add_argument("--size", help="resize the corpus, e.g. 1280x720")
+    parser.add_argument("--sessions", default=",".join(map(str, CONCURRENCY)),
+                        help="comma-separated concurrent session counts")
+    parser.add_argument("--every-frame", action="store_true",
+                        help="disable the scheduler and duplicate skip so every model runs on every frame")
+    parser.add_argument("--out", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    # the server logs with print(); stdout only carries the report
+    with contextlib.redirect_stdout(sys.stderr):
+        report = run_benchmark(
+            video=None if args.synthetic else args.video,
+            frames=args.frames,
+            size=tuple(map(int, args.size.split("x"))) if args.size else None,
+            concurrency=[int(n) for n in args.sessions.split(",")],
+            every_frame=args.every_frame,
+        )
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    print(text)
@@ -303,144 +303,840 @@
 
 
 
-import cv2
 import mediapipe as mp
 import base64
+import os
+import threading
 import time
-import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from posture import PostureTracker
 from eye_contact import EyeContactTracker
-from gesture import GestureTracker
+from gesture import GestureTracker, HANDS_OPTIONS
+from scheduler import FrameScheduler, DuplicateFilter
+from score_stats import ScoreAggregator, WEIGHTS
+import roi
+from landmarks import LandmarkFrame, pose_array, face_array, hands_array
+from latency_tuner import LatencyTuner
+from hand_flow import HandFlow
+from frame_decode import decode_frame, parse_decode_mode, DEFAULT_DECODE_MODE
+from frame_context import FrameContext
+from landmark_store import LandmarkWriter, timeline_path, RAN_POSE, RAN_FACE, RAN_HANDS
 
 # ----------------------------
-# SCORE STATE (FINAL REPORT)
+# MEDIAPIPE CONFIG
 # ----------------------------
 
-score_state = {
-    "posture": [],
-    "eye": [],
-    "gesture": [],
-}
+mp_pose = mp.solutions.pose
+mp_face = mp.solutions.face_mesh
+mp_hands = mp.solutions.hands
+mp_holistic = mp.solutions.holistic
 
-WEIGHTS = {
-    "posture": 0.4,
-    "eye": 0.35,
-    "gesture": 0.25,
-}
+# "separate": pose + face mesh + hands, three graphs per frame
+# "holistic": one fused graph producing all three landmark sets
+INFERENCE_MODES = ("separate", "holistic")
+INFERENCE_MODE = os.getenv("VISION_INFERENCE_MODE", "separate")
 
-# ----------------------------
-# MEDIAPIPE INITIALIZATION
-# ----------------------------
+# per-model rates for "separate" mode; skipped models reuse last output
+SCHEDULER_ENABLED = os.getenv("VISION_SCHEDULER", "1") == "1"
 
-mp_pose = mp.solutions.pose
-mp_face = mp.solutions.face_mesh
+# crop face / hands around the pose landmarks before their graphs run
+ROI_ENABLED = os.getenv("VISION_ROI", "1") == "1"
 
-pose = mp_pose.Pose()
-face_mesh = mp_face.FaceMesh(refine_landmarks=True)
+# "mesh": refined face mesh on every face frame
+# "lite": refined mesh every VISION_IRIS_MESH_EVERY frames, the plain
+#         468-point mesh in between (separate mode only); like the
+#         tuner's refine_every, the iris ratio carries over
+EYE_MODES = ("mesh", "lite")
+EYE_MODE = os.getenv("VISION_EYE_MODE", "mesh")
+IRIS_MESH_EVERY = int(os.getenv("VISION_IRIS_MESH_EVERY", "4"))
 
-# ----------------------------
-# TRACKERS
-# ----------------------------
+# "detect": hands graph on every frame the scheduler picks
+# "flow":   hands graph every VISION_HAND_DETECT_EVERY frames while
+#           hands are visible, optical flow on the keypoints in between
+HAND_TRACKING_MODES = ("detect", "flow")
+HAND_TRACKING = os.getenv("VISION_HAND_TRACKING", "detect")
+
+# one worker (inference thread) per core by default
+POOL_SIZE = int(os.getenv("VISION_WORKERS", os.cpu_count() or 1))
+
+# finished sessions kept around so report polls can still read scores
+MAX_ENDED_SESSIONS = 16
+
+# sessions without a frame for this long are ended (streams that never
+# called /api/stop); checked at most every SESSION_SWEEP_SECONDS
+SESSION_IDLE_SECONDS = float(os.getenv("VISION_SESSION_IDLE_S", "300"))
+SESSION_SWEEP_SECONDS = 30
+
+# persist every session's per-frame landmarks (landmark_store.py)
+LANDMARKS_ENABLED = os.getenv("VISION_LANDMARKS", "1") == "1"
+
+# frames queued or running per worker before new ones are turned away
+MAX_QUEUE_DEPTH = int(os.getenv("VISION_QUEUE_DEPTH", "2"))
+
+# recommended client frame interval (next_frame_ms in every result)
+MIN_FRAME_INTERVAL_MS = 66        # ~15 fps while the scene moves
+TARGET_FRAME_INTERVAL_MS = 100    # ~10 fps, what clients send today
+STATIC_FRAME_INTERVAL_MS = 400    # scene unchanged since last analysis
+MAX_FRAME_INTERVAL_MS = 1000
+ACTIVE_MOTION = 2.0               # thumbnail diff that counts as movement
+PROCESS_EWMA_ALPHA = 0.2
+PROCESS_WARMUP_FRAMES = 3         # first analyzed frames build the graphs
+                                  # lazily; kept out of process_ms
+
+
+def set_inference_mode(mode):
+    global INFERENCE_MODE
+
+    if mode not in INFERENCE_MODES:
+        raise ValueError(f"Unknown inference mode: {mode}")
 
-posture_tracker = PostureTracker()
-eye_tracker = EyeContactTracker()
-gesture_tracker = GestureTracker()
+    INFERENCE_MODE = mode
+
+
+def set_eye_mode(mode):
+    global EYE_MODE
+
+    if mode not in EYE_MODES:
+        raise ValueError(f"Unknown eye mode: {mode}")
+
+    EYE_MODE = mode
+
+
+def set_hand_tracking(mode):
+    global HAND_TRACKING
+
+    if mode not in HAND_TRACKING_MODES:
+        raise ValueError(f"Unknown hand tracking mode: {mode}")
+
+    HAND_TRACKING = mode
 
 # ----------------------------
-# RESET SCORES (CALL AT START)
+# RESULTS
 # ----------------------------
 
-def reset_scores():
-    global posture_tracker, eye_tracker, gesture_tracker, score_state
-    
-    # Clear score state lists
-    for k in score_state:
-        score_state[k].clear()
-    
-    # Reset tracker instances
-    posture_tracker.__init__()
-    eye_tracker.__init__()
-    gesture_tracker.__init__()
+def new_score_state():
+    return {
+        "posture": ScoreAggregator(),
+        "eye": ScoreAggregator(),
+        "gesture": ScoreAggregator(),
+    }
 
 
+def error_result(status="ERROR"):
+    return {
+        "posture_status": status,
+        "eye_status": status,
+        "gesture_status": status,
+        "posture_score": 0,
+        "eye_score": 0,
+        "gesture_score": 0,
+    }
+
 # ----------------------------
-# PROCESS FRAME FROM WEBRTC
+# PER-SESSION STATE
 # ----------------------------
 
-def process_frame_from_webrtc(frame_base64: str):
+class VisionSession:
+    """
+    Everything that belongs to one presenter: trackers, scheduler and
+    the scores collected for the final report.
+    """
 
-    try:
-        # Decode base64 image
-        img_bytes = base64.b64decode(frame_base64)
-        np_arr = np.frombuffer(img_bytes, np.uint8)
-        frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+    def __init__(self, timeline=None):
 
-        if frame is None:
-            return {
-                "posture_status": "ERROR",
-                "eye_status": "ERROR",
-                "gesture_status": "ERROR",
-                "posture_score": 0,
-                "eye_score": 0,
-                "gesture_score": 0,
-            }
+        self.posture_tracker = PostureTracker()
+        self.eye_tracker = EyeContactTracker()
+        self.gesture_tracker = GestureTracker()
+        self.frame_scheduler = FrameScheduler()
+        self.hand_flow = HandFlow()
 
-        now = time.time()
+        # reusable gray / thumbnail / RGB / crop buffers for this stream
+        self.frame_context = FrameContext()
 
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # this presenter's MediaPipe graphs: they track and smooth
+        # across frames, so they are never shared between sessions
+        self.graphs = SessionGraphs()
 
-        # ---------- ANALYSIS ----------
+        # frame_decode mode, set per session with set_decode_mode()
+        self.decode_mode = DEFAULT_DECODE_MODE
+        self.duplicate_filter = DuplicateFilter()
 
-        pose_res = pose.process(rgb)
-        face_res = face_mesh.process(rgb)
+        self.score_state = new_score_state()
 
-        posture_status, angle, posture_pct = posture_tracker.analyze(
-            pose_res.pose_landmarks
-        )
+        self.last_outputs = {
+            "posture": ("NO BODY", 0, 0.0),
+            "eye": ("NO FACE", 0.0),
+        }
 
-        eye_status, eye_pct = eye_tracker.analyze(
-            face_res.multi_face_landmarks
-        )
+        # most recent (33, 4) pose array, used to place the face / hand crops
+        self.last_pose = None
+
+        self.frames = 0
+
+        # answer for frames turned away while the worker is busy
+        self.last_result = None
+
+        # smoothed worker time per frame of this session, for pacing
+        self.process_ms = None
+        self.warmup_frames = PROCESS_WARMUP_FRAMES
+
+        # LandmarkWriter for the session's landmark timeline, or None
+        self.timeline = timeline
+
+        self.ended = False
+        self.expired = False    # ended by idle expiry, not end_session()
 
-        gesture_status, gesture_pct = gesture_tracker.analyze(
-            frame, now
+        # last frame submitted, for idle expiry
+        self.last_seen = time.monotonic()
+
+# ----------------------------
+# INFERENCE WORKERS
+# ----------------------------
+
+class SessionGraphs:
+    """
+    One session's MediaPipe graphs, built lazily on its worker thread,
+    one per setting the latency tuner has asked for so far. Pose, face
+    mesh and hands run in video mode (tracking regions, landmark
+    smoothing), which is only valid for a single presenter's stream.
+    """
+
+    def __init__(self):
+        self.pose_graphs = {}
+        self.face_graphs = {}
+        self.hands = None
+        self.holistic_graphs = {}
+
+    def get_pose(self, complexity=1):
+        if complexity not in self.pose_graphs:
+            try:
+                self.pose_graphs[complexity] = mp_pose.Pose(model_complexity=complexity)
+            except Exception as e:
+                # latency_tuner only hands out tiers whose model is on
+                # disk, so this is a broken install, not a download
+                print(f"⚠️ Pose complexity {complexity} unavailable ({e}), using 1")
+                self.pose_graphs[complexity] = self.get_pose(1)
+        return self.pose_graphs[complexity]
+
+    def get_face_mesh(self, refine=True):
+        if refine not in self.face_graphs:
+            self.face_graphs[refine] = mp_face.FaceMesh(refine_landmarks=refine)
+        return self.face_graphs[refine]
+
+    def get_hands(self):
+        if self.hands is None:
+            self.hands = mp_hands.Hands(**HANDS_OPTIONS)
+        return self.hands
+
+    def get_holistic(self, complexity=1, refine=True):
+        key = (complexity, refine)
+        if key not in self.holistic_graphs:
+            self.holistic_graphs[key] = mp_holistic.Holistic(
+                model_complexity=complexity,
+                refine_face_landmarks=refine,
+            )
+        return self.holistic_graphs[key]
+
+    def close(self):
+        """
+        Free the graphs. Call on the worker thread, after the session's
+        last frame.
+        """
+
+        # a fallback pose graph is stored under two complexities
+        graphs = {id(g): g for g in (
+            *self.pose_graphs.values(), *self.face_graphs.values(),
+            *self.holistic_graphs.values(), self.hands,
+        ) if g is not None}
+
+        for graph in graphs.values():
+            graph.close()
+
+        self.__init__()
+
+
+class VisionWorker:
+    """
+    One inference thread. Sessions pinned to this worker run their
+    frames here one at a time, each on its own SessionGraphs, so a
+    graph is never entered concurrently or fed another presenter's
+    frames.
+    """
+
+    def __init__(self, index):
+
+        self.index = index
+        self.executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix=f"vision-{index}",
         )
+        self.session_ids = set()
+
+        # frames submitted but not finished, bounded by MAX_QUEUE_DEPTH;
+        # running is 1 while one of them is being analyzed
+        self.depth = 0
+        self.running = 0
+        self.depth_lock = threading.Lock()
+
+        # inference cost is shared by every session on this worker
+        self.tuner = LatencyTuner()
+
+    def submit(self, session, img_bytes, counted=False):
+        return self.executor.submit(self.process, session, img_bytes, counted)
+
+    def try_submit(self, session, img_bytes, max_depth=MAX_QUEUE_DEPTH):
+        """
+        Like submit(), but returns None instead of queueing when the
+        worker already has max_depth frames in hand.
+        """
+
+        with self.depth_lock:
+            if self.depth >= max_depth:
+                return None
+            self.depth += 1
+
+        future = self.submit(session, img_bytes, counted=True)
+        future.add_done_callback(self._frame_done)
+
+        return future
+
+    def _frame_done(self, future):
+        with self.depth_lock:
+            self.depth -= 1
+
+    def process(self, session, img_bytes, counted=False):
+
+        # counted: this frame is in depth until its future is done
+        self.running = int(counted)
+
+        try:
+            t0 = time.perf_counter()
+            frame, factor, full_shape = decode_frame(img_bytes, session.decode_mode)
+            t1 = time.perf_counter()
+
+            if frame is None:
+                return error_result()
+
+            return self.analyze(
+                session, frame, time.time(), (t1 - t0) * 1000,
+                full_shape=full_shape, decode_factor=factor,
+            )
+        except Exception as e:
+            print(f"Error in process_frame_bytes: {e}")
+            return error_result()
+        finally:
+            self.running = 0
+
+    def analyze(self, session, frame, now, decode_ms=0.0, full_shape=None, decode_factor=1):
+        """
+        Run the graphs and trackers on one decoded BGR frame. `now` is
+        the frame time in seconds (wall clock live, video time offline).
+        full_shape is the (h, w) of the image before a reduced decode;
+        pixel thresholds (gesture motion) are measured at that size.
+        """
+
+        full_shape = full_shape or frame.shape[:2]
+
+        t1 = time.perf_counter()
+        mode = INFERENCE_MODE
+        tier = self.tuner.tier
+
+        # convert once into the session's buffers; one thumbnail feeds
+        # both the duplicate check and the scheduler
+        ctx = session.frame_context
+        ctx.begin(frame)
+        thumb = ctx.thumb
+        duplicate = session.duplicate_filter.check(thumb)
+
+        stage_ms = {}
+
+        # ---------- ANALYSIS ----------
+
+        # the fused holistic graph produces everything at once, so the
+        # scheduler only applies to the three separate graphs; a
+        # near-duplicate frame runs nothing and reuses every output
+        plan = {"pose": True, "face": True, "hands": True}
+        if duplicate:
+            plan = dict.fromkeys(plan, False)
+        elif SCHEDULER_ENABLED and mode != "holistic":
+            plan = session.frame_scheduler.plan(frame, thumb)
+
+        lm = LandmarkFrame(hands=hands_array(None))
+        cropped = []
+
+        refine_every = tier["refine_every"]
+        if EYE_MODE == "lite" and mode != "holistic":
+            refine_every = max(refine_every, IRIS_MESH_EVERY)
+
+        # flow mode: follow detected hands without the hands graph; a
+        # lost point or a due refresh turns this frame into a detection
+        flow_hands = None
+        hand_flow = HAND_TRACKING == "flow" and mode != "holistic" and not duplicate
+
+        if hand_flow:
+            ts = time.perf_counter()
+
+            if session.hand_flow.tracking():
+                flow_hands = session.hand_flow.track(ctx.gray)
+                plan["hands"] = flow_hands is None
+            elif session.hand_flow.points is not None:
+                plan["hands"] = True
+
+            stage_ms["hand_flow"] = (time.perf_counter() - ts) * 1000
+
+        if any(plan.values()):
+            refine = session.frames % refine_every == 0
+            session.frames += 1
+
+            ts = time.perf_counter()
+            rgb = ctx.rgb(tier["scale"])
+            stage_ms["convert"] = (time.perf_counter() - ts) * 1000
+
+        if mode == "holistic" and not duplicate:
+            ts = time.perf_counter()
+            res = session.graphs.get_holistic(tier["pose_complexity"], refine).process(rgb)
+            stage_ms["holistic"] = (time.perf_counter() - ts) * 1000
+
+            lm.pose = pose_array(res.pose_landmarks)
+            lm.face = face_array([res.face_landmarks] if res.face_landmarks else None)
+            lm.hands = hands_array([
+                hand
+                for hand in (res.left_hand_landmarks, res.right_hand_landmarks)
+                if hand
+            ])
+        else:
+            if plan["pose"]:
+                ts = time.perf_counter()
+                lm.pose = pose_array(session.graphs.get_pose(tier["pose_complexity"]).process(rgb).pose_landmarks)
+                session.last_pose = lm.pose
+                stage_ms["pose"] = (time.perf_counter() - ts) * 1000
+
+            # pose from this frame, or the last one the scheduler ran
+            roi_pose = session.last_pose if ROI_ENABLED else None
+
+            # boxes are in the (possibly downscaled) inference image
+            if plan["face"]:
+                ts = time.perf_counter()
+                box = roi.face_roi(roi_pose, rgb.shape)
+                face_input = ctx.crop(rgb, box, "face") if box else rgb
+
+                lm.face = face_array(session.graphs.get_face_mesh(refine).process(face_input).multi_face_landmarks)
+
+                if box:
+                    roi.to_frame_coords(lm.face, box, rgb.shape)
+                    cropped.append("face")
+
+                stage_ms["face"] = (time.perf_counter() - ts) * 1000
+
+            if plan["hands"]:
+                ts = time.perf_counter()
+                box = roi.hands_roi(roi_pose, rgb.shape)
+                hands_input = ctx.crop(rgb, box, "hands") if box else rgb
+
+                lm.hands = hands_array(session.graphs.get_hands().process(hands_input).multi_hand_landmarks)
+
+                if box:
+                    roi.to_frame_coords(lm.hands, box, rgb.shape)
+                    cropped.append("hands")
+
+                if hand_flow:
+                    session.hand_flow.start(lm.hands, ctx.gray)
+                stage_ms["hands"] = (time.perf_counter() - ts) * 1000
+
+            if flow_hands is not None:
+                lm.hands = flow_hands
+
+        t2 = time.perf_counter()
+        if not duplicate:
+            self.tuner.record((t2 - t1) * 1000)
+
+        last_outputs = session.last_outputs
+
+        if plan["pose"]:
+            last_outputs["posture"] = session.posture_tracker.analyze(lm.pose)
+        posture_status, angle, posture_pct = last_outputs["posture"]
+        ts = time.perf_counter()
+        stage_ms["posture_tracker"] = (ts - t2) * 1000
+
+        if plan["face"]:
+            last_outputs["eye"] = session.eye_tracker.analyze(lm.face)
+        eye_status, eye_pct = last_outputs["eye"]
+        te = time.perf_counter()
+        stage_ms["eye_tracker"] = (te - ts) * 1000
+
+        if plan["hands"] or flow_hands is not None:
+            gesture_status, gesture_pct = session.gesture_tracker.update(
+                lm.hands, full_shape, now
+            )
+        else:
+            gesture_status, gesture_pct = session.gesture_tracker.hold(now)
+        stage_ms["gesture_tracker"] = (time.perf_counter() - te) * 1000
+
+        if session.timeline is not None:
+            ran = (
+                RAN_POSE * plan["pose"]
+                | RAN_FACE * plan["face"]
+                | RAN_HANDS * (plan["hands"] or flow_hands is not None)
+            )
+            session.timeline.append(now, ran, lm, full_shape)
+
+        t3 = time.perf_counter()
 
         # ---------- COLLECT SCORES ----------
 
-        score_state["posture"].append(posture_pct)
-        score_state["eye"].append(eye_pct)
-        score_state["gesture"].append(gesture_pct)
+        session.score_state["posture"].add(posture_pct)
+        session.score_state["eye"].add(eye_pct)
+        session.score_state["gesture"].add(gesture_pct)
 
-        return {
+        result = {
             "posture_status": posture_status,
             "eye_status": eye_status,
             "gesture_status": gesture_status,
             "posture_score": float(posture_pct),
             "eye_score": float(eye_pct),
             "gesture_score": float(gesture_pct),
+            "mode": mode,
+            "tier": tier["name"],
+            "models_run": [name for name, ran in plan.items() if ran]
+            + (["hand_flow"] if flow_hands is not None else []),
+            "duplicate": duplicate,
+            "roi": cropped,
+            "worker": self.index,
+            "decode_factor": decode_factor,
+            "latency_ms": {
+                "decode": round(decode_ms, 2),
+                "inference": round((t2 - t1) * 1000, 2),
+                **{k: round(v, 2) for k, v in stage_ms.items()},
+                "trackers": round((t3 - t2) * 1000, 2),
+                "total": round(decode_ms + (t3 - t1) * 1000, 2),
+            },
         }
+
+        total_ms = result["latency_ms"]["total"]
+        if session.warmup_frames:
+            session.warmup_frames -= not duplicate
+        elif session.process_ms is None:
+            session.process_ms = total_ms
+        else:
+            session.process_ms += PROCESS_EWMA_ALPHA * (total_ms - session.process_ms)
+
+        result["next_frame_ms"] = next_frame_interval(session, self)
+        session.last_result = result
+
+        return result
+
+
+def next_frame_interval(session, worker):
+    """
+    How long the client should wait before sending its next frame.
+
+    Load: a worker serves its sessions one frame at a time, so each
+    gets a turn every process_ms * sessions, plus the frames queued
+    behind the one being analyzed. Motion: a static scene (near-duplicate frames) can be
+    sampled slowly, a moving one faster. The slower of the two wins.
+    """
+
+    motion = session.duplicate_filter.diff
+
+    if motion >= ACTIVE_MOTION:
+        motion_ms = MIN_FRAME_INTERVAL_MS
+    elif motion < session.duplicate_filter.threshold:
+        motion_ms = STATIC_FRAME_INTERVAL_MS
+    else:
+        motion_ms = TARGET_FRAME_INTERVAL_MS
+
+    # before the first result, assume a frame costs one target interval
+    process_ms = session.process_ms
+    if process_ms is None:
+        process_ms = TARGET_FRAME_INTERVAL_MS
+    sessions, queued = (
+        (len(worker.session_ids), max(worker.depth - worker.running, 0))
+        if worker else (1, 0)
+    )
+    load_ms = process_ms * (max(sessions, 1) + queued)
+
+    return int(min(max(motion_ms, load_ms, MIN_FRAME_INTERVAL_MS), MAX_FRAME_INTERVAL_MS))
+
+
+class WorkerPool:
+    """
+    Routes every session to one worker for its whole lifetime, picking
+    the worker with the fewest live sessions. Workers are created on
+    first use, up to `size`.
+    """
+
+    def __init__(self, size):
+
+        self.size = max(1, size)
+        self.workers = []
+        self.sessions = {}
+        self.assignments = {}
+        self.lock = threading.Lock()
+        self.next_sweep = time.monotonic() + SESSION_SWEEP_SECONDS
+
+    def get_session(self, session_id):
+        """
+        The session, created if new. For calls that configure it; read
+        paths use find_session() so they never create one.
+        """
+
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = self.sessions[session_id] = VisionSession()
+                self._prune_ended()
+            return session
+
+    def find_session(self, session_id):
+        with self.lock:
+            return self.sessions.get(session_id)
+
+    def find_worker(self, session_id):
+        with self.lock:
+            return self.assignments.get(session_id)
+
+    def session_for_frame(self, session_id):
+        """
+        (session, worker) for an incoming frame, creating and pinning a
+        new session. The worker is None for an ended session: its
+        scores are final and the frame must not be analyzed. A stream
+        that resumes after idle expiry starts a fresh session.
+        """
+
+        self.expire_idle()
+
+        session = self.get_session(session_id)
+        if session.ended and session.expired:
+            self.reset_session(session_id)
+            session = self.get_session(session_id)
+
+        with self.lock:
+            if session.ended:
+                return session, None
+
+            session.last_seen = time.monotonic()
+            return session, self._pin(session_id)
+
+    def expire_idle(self):
+        """
+        End sessions that stopped sending frames without an end_session
+        call, so their graphs, buffers and worker pin are released.
+        """
+
+        now = time.monotonic()
+
+        with self.lock:
+            if now < self.next_sweep:
+                return
+            self.next_sweep = now + SESSION_SWEEP_SECONDS
+
+            idle = [
+                sid for sid, s in self.sessions.items()
+                if not s.ended and now - s.last_seen > SESSION_IDLE_SECONDS
+            ]
+
+        for sid in idle:
+            print(f"⏱️ Vision session {sid} idle, ending it")
+            self.end_session(sid, idle_before=now - SESSION_IDLE_SECONDS)
+
+    def reset_session(self, session_id):
+
+        with self.lock:
+            old = self.sessions.get(session_id)
+            worker = self.assignments.get(session_id)
+
+        # the new writer reuses the path, so the old one must be done
+        if old is not None:
+            self._release(old, worker).result()
+
+        timeline = None
+        if LANDMARKS_ENABLED and session_id is not None:
+            timeline = LandmarkWriter(timeline_path(session_id))
+
+        with self.lock:
+            self.sessions[session_id] = VisionSession(timeline)
+            self._prune_ended()
+
+    def worker_for(self, session_id):
+
+        with self.lock:
+            return self._pin(session_id)
+
+    def _pin(self, session_id):
+
+        worker = self.assignments.get(session_id)
+
+        if worker is None:
+            if len(self.workers) < self.size:
+                self.workers.append(VisionWorker(len(self.workers)))
+
+            worker = min(self.workers, key=lambda w: len(w.session_ids))
+            worker.session_ids.add(session_id)
+            self.assignments[session_id] = worker
+
+        return worker
+
+    def end_session(self, session_id, idle_before=None):
+        """
+        With idle_before (idle expiry) the session is only ended if no
+        frame arrived after that time.
+        """
+
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if idle_before is not None and (session is None or session.last_seen > idle_before):
+                return
+
+            worker = self.assignments.pop(session_id, None)
+            if worker:
+                worker.session_ids.discard(session_id)
+
+            if session:
+                session.ended = True
+                session.expired = idle_before is not None
+
+        if session:
+            self._release(session, worker)
+
+    def _release(self, session, worker):
+        """
+        Finalize the session's landmark file and free its graphs on
+        the thread that uses them, after any frames still queued there.
+        Scores stay readable.
+        """
+
+        def close():
+            timeline, session.timeline = session.timeline, None
+            if timeline is not None:
+                timeline.close()
+            session.graphs.close()
+
+            # ended sessions only keep their scores
+            if session.ended:
+                session.frame_context = None
+
+        if worker is None:
+            done = Future()
+            close()
+            done.set_result(None)
+            return done
+
+        return worker.executor.submit(close)
+
+    def _prune_ended(self):
+
+        ended = [sid for sid, s in self.sessions.items() if s.ended]
+        for sid in ended[:-MAX_ENDED_SESSIONS]:
+            del self.sessions[sid]
+
+
+pool = WorkerPool(POOL_SIZE)
+
+# ----------------------------
+# RESET SCORES (CALL AT START)
+# ----------------------------
+
+def reset_scores(session_id=None):
+    pool.reset_session(session_id)
+
+
+def end_session(session_id=None):
+    """
+    Unpin the session from its worker. Scores stay readable for the
+    report until the session is pruned.
+    """
+
+    pool.end_session(session_id)
+
+# ----------------------------
+# PROCESS FRAME FROM WEBRTC
+# ----------------------------
+
+def process_frame_from_webrtc(frame_base64: str, session_id=None):
+    """
+    Legacy entry point for clients that send {"frame": <base64>}.
+    """
+
+    try:
+        img_bytes = base64.b64decode(frame_base64)
     except Exception as e:
         print(f"Error in process_frame_from_webrtc: {e}")
-        return {
-            "posture_status": "ERROR",
-            "eye_status": "ERROR",
-            "gesture_status": "ERROR",
-            "posture_score": 0,
-            "eye_score": 0,
-            "gesture_score": 0,
-        }
+        return error_result()
+
+    return process_frame_bytes(img_bytes, session_id)
+
+
+def process_frame_bytes(img_bytes, session_id=None):
+    """
+    Analyze one encoded frame (raw JPEG / WebP body, no base64) on the
+    worker pinned to session_id. Blocks until the result is ready.
+    """
+
+    session, worker = pool.session_for_frame(session_id)
+    if worker is None:
+        return error_result("ENDED")
+
+    return worker.submit(session, img_bytes).result()
+
+
+def submit_frame(frame, session_id=None):
+    """
+    Non-blocking entry point for the async routes. `frame` is base64
+    text or raw encoded bytes. Returns a concurrent.futures.Future for
+    the result, or None when the session's worker queue is full; the
+    caller should then answer with busy_result().
+    """
+
+    if isinstance(frame, str):
+        try:
+            frame = base64.b64decode(frame)
+        except Exception as e:
+            print(f"Error in submit_frame: {e}")
+            future = Future()
+            future.set_result(error_result())
+            return future
+
+    session, worker = pool.session_for_frame(session_id)
+    if worker is None:
+        future = Future()
+        future.set_result(error_result("ENDED"))
+        return future
+
+    return worker.try_submit(session, frame)
+
 
+def busy_result(session_id=None):
+    """
+    Fast answer for a frame that was not analyzed: the session's last
+    result, flagged busy. Nothing is added to the scores.
+    """
+
+    session = pool.find_session(session_id)
+    last = session.last_result if session else None
+
+    result = dict(last) if last else error_result("BUSY")
+    result["busy"] = True
+    result["next_frame_ms"] = (
+        next_frame_interval(session, pool.find_worker(session_id))
+        if session else TARGET_FRAME_INTERVAL_MS
+    )
+
+    return result
 
 # ----------------------------
 # FINAL SCORE CALCULATION
 # ----------------------------
 
-def compute_scores():
+def compute_scores(session_id=None):
+    session = pool.find_session(session_id)
+    return summarize_scores(session.score_state if session else new_score_state())
+
 
-    def avg(lst):
-        return round(sum(lst) / len(lst), 1) if lst else 0
+def summarize_scores(score_state):
+
+    def avg(agg):
+        return round(agg.mean, 1) if agg.count else 0
 
     posture_avg = avg(score_state["posture"])
     eye_avg = avg(score_state["eye"])
@@ -459,3 +1155,36 @@ def compute_scores():
         "gesture": gesture_avg,
         "overall": overall,
     }
+
+
+def get_score_stats(session_id=None):
+    """
+    Per-metric count / mean / min / max / histogram for a session.
+    """
+
+    session = pool.find_session(session_id)
+    score_state = session.score_state if session else new_score_state()
+
+    return {k: agg.summary() for k, agg in score_state.items()}
+
+
+def set_decode_mode(mode, session_id=None):
+    """
+    Choose how this session's frames are decoded: "full", "auto" or a
+    fixed JPEG scaling factor (2 / 4 / 8). Raises ValueError.
+    """
+
+    mode = parse_decode_mode(mode)
+    pool.get_session(session_id).decode_mode = mode
+
+    return mode
+
+
+def get_duplicate_stats(session_id=None):
+    """
+    How many of a session's frames were skipped as near-duplicates,
+    for tuning VISION_DUPLICATE_THRESHOLD.
+    """
+
+    session = pool.find_session(session_id)
+    return (session.duplicate_filter if session else DuplicateFilter()).stats()
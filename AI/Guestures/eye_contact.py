@@ -1,25 +1,47 @@
+IRIS = 468          # left iris centre, only in the refined 478-point mesh
+
+GOOD_RATIO = (0.42, 0.58)   # iris position between the eye corners
+
+
 class EyeContactTracker:
 
     def __init__(self):
         self.good = 0
         self.total = 0
+        self.last_ratio = None
 
-    def analyze(self, face_landmarks):
+    def analyze(self, face):
+        """
+        face: (478, >=1) array of normalized face mesh landmarks, or
+        None. An unrefined 468-point mesh has no iris, so the ratio
+        from the last refined frame is carried over.
+        """
 
-        eye_status = "NO FACE"
-        current_frame_score = 0  # Score for THIS frame (0-100)
+        ratio = None
 
-        if face_landmarks:
+        if face is not None:
 
-            m = face_landmarks[0].landmark
+            if len(face) > IRIS:
+                iris, l, r = face[[IRIS, 33, 133], 0].tolist()
 
-            iris = m[468].x
-            l = m[33].x
-            r = m[133].x
+                ratio = (iris - l) / (r - l)
+                self.last_ratio = ratio
+            else:
+                ratio = self.last_ratio
+
+        return self.score(ratio)
+
+    def score(self, ratio):
+        """
+        Status and score for an iris ratio; None means no face.
+        """
+
+        eye_status = "NO FACE"
+        current_frame_score = 0  # Score for THIS frame (0-100)
 
-            ratio = (iris - l) / (r - l)
+        if ratio is not None:
 
-            if 0.42 < ratio < 0.58:
+            if GOOD_RATIO[0] < ratio < GOOD_RATIO[1]:
                 eye_status = "GOOD"
                 current_frame_score = 100  # Good eye contact = 100%
             else:
@@ -0,0 +1,82 @@
+import cv2
+import numpy as np
+
+import roi
+from scheduler import MOTION_SIZE
+
+
+class FrameContext:
+    """
+    Per-session preprocessing buffers, reused frame after frame. The
+    BGR frame is converted once into each view the pipeline needs:
+
+      gray   full-size grayscale (optical flow)
+      thumb  MOTION_SIZE grayscale (duplicate check, scheduler)
+      rgb()  RGB at the tier's scale (graph input)
+      crop() face / hand regions of the RGB view
+
+    Everything is written with dst= into buffers that are allocated
+    once per frame size, so a steady stream allocates only the decoded
+    frame itself (cv2.imdecode has no dst in the Python bindings).
+
+    The views are overwritten by the next frame: anything that keeps
+    one across frames must copy it.
+    """
+
+    def __init__(self):
+
+        self.shape = None
+        self.frame = None
+
+        self.gray = None
+        self.thumb = np.empty(MOTION_SIZE[::-1], dtype=np.uint8)
+
+        self.rgb_full = None
+        self.rgb_scaled = {}    # by tier scale, at most one per tier
+
+        # crops are at most MAX_SIDE square; a flat buffer gives a
+        # contiguous (h, w, 3) view of any smaller size
+        self.crop_buffers = {
+            name: np.empty(roi.MAX_SIDE * roi.MAX_SIDE * 3, dtype=np.uint8)
+            for name in ("face", "hands")
+        }
+
+    def begin(self, frame):
+        """
+        Start a new frame: fills gray and thumb. The RGB view is only
+        converted when asked for, since duplicates never need it.
+        """
+
+        if frame.shape != self.shape:
+            h, w = frame.shape[:2]
+            self.shape = frame.shape
+            self.gray = np.empty((h, w), dtype=np.uint8)
+            self.rgb_full = np.empty((h, w, 3), dtype=np.uint8)
+            self.rgb_scaled = {}
+
+        self.frame = frame
+
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        cv2.resize(self.gray, MOTION_SIZE, dst=self.thumb, interpolation=cv2.INTER_AREA)
+
+    def rgb(self, scale=1.0):
+
+        cv2.cvtColor(self.frame, cv2.COLOR_BGR2RGB, dst=self.rgb_full)
+
+        if scale >= 1:
+            return self.rgb_full
+
+        # landmarks are normalized, so a smaller input needs no remapping
+        buf = self.rgb_scaled.get(scale)
+        if buf is None:
+            h, w = self.shape[:2]
+            buf = self.rgb_scaled[scale] = np.empty(
+                (round(h * scale), round(w * scale), 3), dtype=np.uint8
+            )
+
+        cv2.resize(self.rgb_full, None, dst=buf, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        return buf
+
+    def crop(self, rgb, box, name):
+        return roi.crop(rgb, box, out=self.crop_buffers[name])
@@ -0,0 +1,131 @@
+import os
+
+import cv2
+import numpy as np
+
+# ----------------------------
+# DECODE MODES
+# ----------------------------
+
+# "full":    always decode at full resolution
+# "auto":    JPEG is decoded with libjpeg DCT scaling at the largest
+#            factor that keeps the long side >= DECODE_MIN_SIDE
+# 2, 4, 8:   fixed JPEG scaling factor
+DECODE_MODES = ("full", "auto", 2, 4, 8)
+
+# the graphs run at 192-256 px and the face / hand crops at <= 320 px,
+# so 640 leaves room for the crops without decoding pixels nobody reads
+DECODE_MIN_SIDE = int(os.getenv("VISION_DECODE_MIN_SIDE", "640"))
+
+REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# start-of-frame markers that carry the image size (not DHT / DAC)
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+               0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def parse_decode_mode(mode):
+    """
+    Normalize a decode mode from a query string or JSON body.
+    """
+
+    if isinstance(mode, str) and mode.isdigit():
+        mode = int(mode)
+
+    if mode not in DECODE_MODES:
+        raise ValueError(f"Unknown decode mode: {mode}")
+
+    return mode
+
+
+# digits from the environment become ints; a bad value fails at import
+DEFAULT_DECODE_MODE = parse_decode_mode(os.getenv("VISION_DECODE", "auto"))
+
+
+def jpeg_size(buf):
+    """
+    (width, height) from the JPEG start-of-frame segment, read without
+    decoding anything; None if buf is not a JPEG or has no SOF.
+    """
+
+    if len(buf) < 4 or buf[0] != 0xFF or buf[1] != 0xD8:
+        return None
+
+    i = 2
+    n = len(buf)
+
+    while i + 9 < n:
+
+        if buf[i] != 0xFF:
+            return None
+
+        marker = buf[i + 1]
+
+        # fill bytes / standalone markers have no length
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+
+        length = (buf[i + 2] << 8) | buf[i + 3]
+
+        if marker in SOF_MARKERS:
+            h = (buf[i + 5] << 8) | buf[i + 6]
+            w = (buf[i + 7] << 8) | buf[i + 8]
+            return w, h
+
+        if marker == 0xDA:      # start of scan: no SOF before the data
+            return None
+
+        i += 2 + length
+
+    return None
+
+
+def reduction_for(mode, size):
+    """
+    DCT scaling factor for a JPEG of `size` (w, h) under `mode`.
+    """
+
+    if mode == "full" or size is None:
+        return 1
+
+    if mode != "auto":
+        return mode
+
+    factor = 1
+    while factor < 8 and max(size) // (factor * 2) >= DECODE_MIN_SIDE:
+        factor *= 2
+
+    return factor
+
+
+def decode_frame(img_bytes, mode="full"):
+    """
+    Decode an encoded image (JPEG / WebP / PNG) straight from the
+    request buffer; np.frombuffer wraps the bytes without copying.
+    Returns (frame, factor, (h, w) of the full-size image).
+
+    Only JPEG is decoded reduced: OpenCV implements the other formats'
+    IMREAD_REDUCED_* as a full decode plus resize, which is slower.
+    """
+
+    size = jpeg_size(img_bytes)
+    factor = reduction_for(mode, size)
+
+    np_arr = np.frombuffer(img_bytes, np.uint8)
+    frame = cv2.imdecode(np_arr, REDUCED_FLAGS[factor])
+
+    if frame is None:
+        return None, factor, None
+
+    full_shape = (size[1], size[0]) if size else frame.shape[:2]
+
+    return frame, factor, full_shape
@@ -1,7 +1,19 @@
-import math
 import mediapipe as mp
+import numpy as np
 import cv2
 
+from landmarks import hands_array
+
+KEYPOINTS = [0, 8, 12]     # wrist, index tip, middle tip
+MOTION_THRESHOLD = 9       # mean keypoint displacement (px) per frame
+IDLE_SECONDS = 8
+
+HANDS_OPTIONS = {
+    "max_num_hands": 2,
+    "min_detection_confidence": 0.6,
+    "min_tracking_confidence": 0.6,
+}
+
 
 class GestureTracker:
 
@@ -10,67 +22,81 @@ class GestureTracker:
         self.mp_hands = mp.solutions.hands
         self.drawer = mp.solutions.drawing_utils
 
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=2,
-            min_detection_confidence=0.6,
-            min_tracking_confidence=0.6,
-        )
+        # only built if analyze() is used; the camera server runs hands
+        # on its worker's graph and calls update() instead
+        self.hands = None
 
         self.prev_hands = None
-        self.last_move = 0
+        self.last_move = None
 
         self.total = 0
         self.moving_frames = 0
 
-    def analyze(self, frame, now):
+    def analyze(self, frame, now, rgb=None):
+        """
+        Run the hands graph on a BGR frame. Pass `rgb` when the caller
+        already has the frame converted (e.g. FrameContext.rgb()).
+        """
 
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        res = self.hands.process(rgb)
+        if self.hands is None:
+            self.hands = self.mp_hands.Hands(**HANDS_OPTIONS)
 
-        hands = []
+        if rgb is None:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        res = self.hands.process(rgb)
 
-        if res.multi_hand_landmarks:
+        return self.update(hands_array(res.multi_hand_landmarks), frame.shape, now)
 
-            h, w, _ = frame.shape
+    def update(self, hands, frame_shape, now):
+        """
+        Score hand landmarks produced elsewhere (worker graph, holistic).
+        hands is an (n_hands, 21, >=2) array of normalized landmarks.
+        """
 
-            for hand in res.multi_hand_landmarks:
+        h, w = frame_shape[:2]
 
-                lm_list = []
+        # pixel coords of the tracked keypoints, truncated like int();
+        # float64 so rounding matches the old per-landmark math
+        pts = (hands[:, KEYPOINTS, :2].astype(np.float64) * (w, h)).astype(np.int32)
 
-                for i, lm in enumerate(hand.landmark):
-                    lm_list.append(
-                        [i, int(lm.x * w), int(lm.y * h)]
-                    )
+        return self._score(pts, now)
 
-                hands.append(lm_list)
+    def hold(self, now):
+        """
+        Score a frame where hand inference was skipped: the hands are
+        assumed to be where they were last seen, so they count as not
+        moving and the idle timer keeps running.
+        """
 
-        moving = False
+        return self._score(self.prev_hands, now)
 
-        if hands and self.prev_hands:
+    def _score(self, hands, now):
 
-            for a, b in zip(self.prev_hands, hands):
+        moving = False
 
-                total = 0
+        has_hands = hands is not None and len(hands) > 0
+        had_hands = self.prev_hands is not None and len(self.prev_hands) > 0
 
-                for pid in [0, 8, 12]:
+        if has_hands and had_hands:
 
-                    total += math.hypot(
-                        b[pid][1] - a[pid][1],
-                        b[pid][2] - a[pid][2],
-                    )
+            # hands pair up in detection order, like zip()
+            n = min(len(hands), len(self.prev_hands))
+            delta = hands[:n] - self.prev_hands[:n]
+            dist = np.hypot(delta[..., 0], delta[..., 1]).mean(axis=1)
 
-                if total / 3 > 9:
-                    moving = True
-                    self.last_move = now
+            if (dist > MOTION_THRESHOLD).any():
+                moving = True
+                self.last_move = now
 
-        elif hands:
+        elif has_hands:
             self.last_move = now
 
         self.prev_hands = hands
 
-        idle = now - self.last_move
+        # never seen hands yet counts as idle forever
+        idle = now - self.last_move if self.last_move is not None else float("inf")
 
-        if idle > 8:
+        if idle > IDLE_SECONDS:
             status = "NO GESTURES"
             current_frame_score = 0  # No hands detected = 0%
         elif moving:
@@ -0,0 +1,136 @@
+import os
+
+import cv2
+import numpy as np
+
+from gesture import KEYPOINTS
+from landmarks import HAND_POINTS
+
+# ----------------------------
+# CONFIG
+# ----------------------------
+
+DETECT_EVERY = int(os.getenv("VISION_HAND_DETECT_EVERY", "5"))   # full hands
+                                                                 # graph every Nth frame
+MAX_HANDS = 2
+
+LK_PARAMS = {
+    "winSize": (21, 21),
+    "maxLevel": 3,      # fast gestures move tens of pixels per frame
+    "criteria": (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03),
+}
+
+MAX_FB_ERROR = 1.5      # px; forward-backward disagreement = lost point
+MIN_PATCH_NCC = 0.8     # appearance match of each point before / after;
+                        # catches points left behind on the background
+PATCH_SIZE = (15, 15)
+SEARCH_MARGIN = 96      # px around the keypoints that flow looks at;
+                        # beyond the pyramid's reach anyway
+
+
+def patch_similarity(prev_gray, gray, prev_pts, pts):
+    """
+    Lowest normalized cross-correlation between the patch around each
+    point in the previous frame and around its tracked position.
+    """
+
+    worst = 1.0
+
+    for (p0,), (p1,) in zip(prev_pts, pts):
+        a = cv2.getRectSubPix(prev_gray, PATCH_SIZE, (float(p0[0]), float(p0[1])))
+        b = cv2.getRectSubPix(gray, PATCH_SIZE, (float(p1[0]), float(p1[1])))
+        worst = min(worst, float(cv2.matchTemplate(a, b, cv2.TM_CCOEFF_NORMED)[0, 0]))
+
+    return worst
+
+
+class HandFlow:
+    """
+    Follows the gesture keypoints (wrist, index tip, middle tip) of the
+    last hands detection with pyramidal Lucas-Kanade optical flow, so
+    the hands graph only has to run every DETECT_EVERY frames. When a
+    point is lost, the caller runs the detector on the same frame.
+    """
+
+    def __init__(self, detect_every=DETECT_EVERY):
+        self.detect_every = detect_every
+        self.reset()
+
+    def reset(self):
+        self.prev_gray = None
+        self.points = None      # (n_hands * 3, 1, 2) float32 pixels
+        self.since_detect = 0
+
+    def keep_gray(self, gray):
+
+        # gray may be a reused FrameContext buffer: keep a private copy
+        if self.prev_gray is None or self.prev_gray.shape != gray.shape:
+            self.prev_gray = gray.copy()
+        else:
+            np.copyto(self.prev_gray, gray)
+
+    def tracking(self):
+        """
+        True when this frame can be tracked instead of detected.
+        """
+
+        return self.points is not None and self.since_detect < self.detect_every - 1
+
+    def start(self, hands, gray):
+        """
+        Seed from a detection: hands is the (n, 21, 3) normalized array.
+        """
+
+        self.since_detect = 0
+        self.keep_gray(gray)
+
+        n = min(len(hands), MAX_HANDS)
+        if not n:
+            self.points = None
+            return
+
+        h, w = gray.shape[:2]
+        pts = hands[:n][:, KEYPOINTS, :2] * (w, h)
+        self.points = np.ascontiguousarray(pts.reshape(-1, 1, 2), dtype=np.float32)
+
+    def track(self, gray):
+        """
+        Move the keypoints to this frame. Returns an (n, 21, 3) hands
+        array with only the KEYPOINTS rows filled (NaN elsewhere, which
+        GestureTracker never reads), or None if tracking was lost.
+        """
+
+        h, w = gray.shape[:2]
+
+        # only the neighbourhood of the hands, not the whole frame
+        lo = np.maximum(self.points.min(axis=(0, 1)) - SEARCH_MARGIN, 0).astype(int)
+        hi = np.minimum(self.points.max(axis=(0, 1)) + SEARCH_MARGIN, (w, h)).astype(int)
+        prev_roi = self.prev_gray[lo[1]:hi[1], lo[0]:hi[0]]
+        roi = gray[lo[1]:hi[1], lo[0]:hi[0]]
+        pts = self.points - lo.astype(np.float32)
+
+        nxt, status, _ = cv2.calcOpticalFlowPyrLK(prev_roi, roi, pts, None, **LK_PARAMS)
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(roi, prev_roi, nxt, None, **LK_PARAMS)
+
+        fb_error = np.linalg.norm((back - pts).reshape(-1, 2), axis=1)
+
+        if not (status.all() and back_status.all() and (fb_error < MAX_FB_ERROR).all()):
+            self.points = None
+            return None
+
+        if patch_similarity(prev_roi, roi, pts, nxt) < MIN_PATCH_NCC:
+            self.points = None
+            return None
+
+        nxt += lo.astype(np.float32)
+        self.points = nxt
+        self.keep_gray(gray)
+        self.since_detect += 1
+
+        n = len(nxt) // len(KEYPOINTS)
+
+        hands = np.full((n, HAND_POINTS, 3), np.nan, dtype=np.float32)
+        hands[:, KEYPOINTS, :2] = nxt.reshape(n, len(KEYPOINTS), 2) / (w, h)
+        hands[:, KEYPOINTS, 2] = 0
+
+        return hands
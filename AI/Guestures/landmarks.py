@@ -0,0 +1,68 @@
+import numpy as np
+
+# ----------------------------
+# LAYOUT
+# ----------------------------
+
+POSE_POINTS = 33      # x, y, z, visibility
+FACE_POINTS = 478     # x, y, z (468 without iris refinement)
+HAND_POINTS = 21      # x, y, z
+
+NO_HANDS = np.zeros((0, HAND_POINTS, 3), dtype=np.float32)
+
+
+def pose_array(pose_landmarks):
+    """
+    (33, 4) float32 of normalized x, y, z and visibility, or None.
+    """
+
+    if not pose_landmarks:
+        return None
+
+    return np.array(
+        [(lm.x, lm.y, lm.z, lm.visibility) for lm in pose_landmarks.landmark],
+        dtype=np.float32,
+    )
+
+
+def face_array(face_landmarks):
+    """
+    (N, 3) float32 for the first face of a multi_face_landmarks list.
+    """
+
+    if not face_landmarks:
+        return None
+
+    return np.array(
+        [(lm.x, lm.y, lm.z) for lm in face_landmarks[0].landmark],
+        dtype=np.float32,
+    )
+
+
+def hands_array(hand_landmarks):
+    """
+    (n_hands, 21, 3) float32; an empty (0, 21, 3) array when no hands.
+    """
+
+    if not hand_landmarks:
+        return NO_HANDS
+
+    return np.array(
+        [[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in hand_landmarks],
+        dtype=np.float32,
+    )
+
+
+class LandmarkFrame:
+    """
+    All landmarks of one inference, filled once and shared by every
+    tracker. pose / face are None when nothing was detected, hands is
+    an empty (0, 21, 3) array.
+    """
+
+    __slots__ = ("pose", "face", "hands")
+
+    def __init__(self, pose=None, face=None, hands=None):
+        self.pose = pose
+        self.face = face
+        self.hands = hands
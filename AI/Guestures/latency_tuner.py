@@ -0,0 +1,161 @@
+import os
+import sys
+
+# ----------------------------
+# QUALITY TIERS (best first)
+# ----------------------------
+
+# pose_complexity: mp Pose model_complexity (0 lite, 1 full, 2 heavy)
+# refine_every:    run the iris-refined face mesh every Nth frame,
+#                  the plain 468-point mesh in between
+# scale:           input resolution factor before inference
+TIERS = [
+    {"name": "max", "pose_complexity": 2, "refine_every": 1, "scale": 1.0},
+    {"name": "high", "pose_complexity": 1, "refine_every": 1, "scale": 1.0},
+    {"name": "medium", "pose_complexity": 1, "refine_every": 1, "scale": 0.75},
+    {"name": "low", "pose_complexity": 0, "refine_every": 2, "scale": 0.5},
+    {"name": "minimal", "pose_complexity": 0, "refine_every": 4, "scale": 0.5},
+]
+
+DEFAULT_TIER = 1            # "high" == the original fixed settings
+
+# mp Pose model file per model_complexity. Only the full model ships
+# with the mediapipe wheel; the others are downloaded by the graph on
+# first use, which stalls the inference thread and fails offline.
+POSE_MODELS = {0: "lite", 1: "full", 2: "heavy"}
+
+# without opting in, the tuner only steps down from DEFAULT_TIER and
+# back: a fast machine keeps the original settings instead of climbing
+# to a heavier model
+TIER_UPGRADE = os.getenv("VISION_TIER_UPGRADE", "0") == "1"
+
+LATENCY_BUDGET_MS = float(os.getenv("VISION_LATENCY_BUDGET_MS", "100"))
+
+EWMA_ALPHA = 0.2
+HEADROOM = 0.5              # step up only when well under budget
+DOWN_PATIENCE = 10          # frames over budget before stepping down
+UP_PATIENCE = 60            # frames under headroom before stepping up
+MAX_UP_PATIENCE = UP_PATIENCE * 16
+
+
+def available_pose_complexities():
+    """
+    model_complexity values whose Pose model is already on disk.
+    """
+
+    import mediapipe as mp
+
+    models = os.path.join(os.path.dirname(mp.__file__), "modules", "pose_landmark")
+
+    return {
+        c for c, name in POSE_MODELS.items()
+        if os.path.exists(os.path.join(models, f"pose_landmark_{name}.tflite"))
+    }
+
+
+def resolve_tiers(tiers, default, available):
+    """
+    The tiers that can run with the available Pose models, and the new
+    index of tiers[default]. A tier whose model is missing uses the
+    nearest available one and is renamed after it ("low-full"); if that
+    makes it the same as a tier that needed no change it is dropped.
+    """
+
+    def settings(t):
+        return t["pose_complexity"], t["refine_every"], t["scale"]
+
+    exact = {settings(t) for t in tiers if t["pose_complexity"] in available}
+
+    active = []
+    default_index = 0
+
+    for i, t in enumerate(tiers):
+        c = t["pose_complexity"]
+
+        if c not in available:
+            c = min(available, key=lambda a: (abs(a - c), a))
+            t = {**t, "name": f"{t['name']}-{POSE_MODELS[c]}", "pose_complexity": c}
+            if settings(t) in exact:
+                continue
+
+        if i == default:
+            default_index = len(active)
+        active.append(t)
+
+    return active, default_index
+
+
+ACTIVE_TIERS, ACTIVE_DEFAULT = resolve_tiers(TIERS, DEFAULT_TIER, available_pose_complexities() or {1})
+
+if ACTIVE_TIERS != TIERS:
+    print(f"⚙️ Vision tiers: {', '.join(t['name'] for t in ACTIVE_TIERS)} (missing Pose models)", file=sys.stderr)
+
+
+class LatencyTuner:
+    """
+    Tracks a smoothed per-frame inference time and moves between
+    quality tiers to stay within the latency budget. Steps down fast,
+    steps up slowly, and restarts the average after every change.
+    A step up that has to be undone right away doubles the wait
+    before the next one, so the tier does not oscillate.
+    A budget of 0 disables tuning. Unless upgrade is set, the start
+    tier is also the best one it moves to.
+    """
+
+    def __init__(self, budget_ms=LATENCY_BUDGET_MS, start=ACTIVE_DEFAULT,
+                 upgrade=TIER_UPGRADE, tiers=ACTIVE_TIERS):
+        self.budget_ms = budget_ms
+        self.tiers = tiers
+        self.index = start
+        self.top = 0 if upgrade else start
+        self.ewma = None
+        self.over = 0
+        self.under = 0
+        self.frames_in_tier = 0
+        self.up_patience = UP_PATIENCE
+        self.last_step = 0
+
+    @property
+    def tier(self):
+        return self.tiers[self.index]
+
+    def record(self, inference_ms):
+
+        if self.budget_ms <= 0:
+            return
+
+        self.frames_in_tier += 1
+
+        if self.ewma is None:
+            self.ewma = inference_ms
+        else:
+            self.ewma += EWMA_ALPHA * (inference_ms - self.ewma)
+
+        if self.ewma > self.budget_ms:
+            self.over += 1
+            self.under = 0
+        elif self.ewma < self.budget_ms * HEADROOM:
+            self.under += 1
+            self.over = 0
+        else:
+            self.over = self.under = 0
+
+        if self.over >= DOWN_PATIENCE and self.index < len(self.tiers) - 1:
+            self._step(+1)
+        elif self.under >= self.up_patience and self.index > self.top:
+            self._step(-1)
+
+    def _step(self, delta):
+
+        # stepping back down right after a step up: back off
+        if delta > 0 and self.last_step < 0 and self.frames_in_tier < UP_PATIENCE:
+            self.up_patience = min(self.up_patience * 2, MAX_UP_PATIENCE)
+
+        old = self.tier["name"]
+        self.index += delta
+        self.last_step = delta
+        self.frames_in_tier = 0
+        self.ewma = None
+        self.over = self.under = 0
+
+        print(f"⚙️ Vision tier {old} -> {self.tier['name']}", file=sys.stderr)
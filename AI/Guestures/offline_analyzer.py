@@ -0,0 +1,195 @@
+import json
+import math
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+# ----------------------------
+# CONFIG
+# ----------------------------
+
+CHUNK_SECONDS = 30      # video time handled by one process task
+SAMPLE_FPS = 15         # live clients send ~10-15 fps; gesture motion
+                        # thresholds are per frame, so match that rate
+TIMELINE_EVERY = 1.0    # seconds between feedback timeline entries
+SEEK_TOLERANCE = 0.001  # timestamps within this of a target count as on it
+
+
+def _video_info(path):
+    """
+    Nominal fps and duration in seconds. Browser WebM is variable frame
+    rate and often has no frame count in the header, so without one the
+    duration is the timestamp of the last frame. It only sizes the
+    chunks: the last chunk reads to the end of the file either way.
+    """
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    if count > 0:
+        duration = count / fps
+    else:
+        last = 0.0
+        while cap.grab():
+            last = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+        duration = last + 1 / fps
+
+    cap.release()
+    return fps, duration
+
+
+def _analyze_chunk(path, start, stop, sample_fps):
+    """
+    Runs in a pool process: decode the frames with timestamps in
+    [start, stop) seconds (stop None = to the end) and feed them
+    through a private worker + session at about sample_fps.
+    """
+
+    # imported here so each process builds its own graphs
+    from camera_server import VisionSession, VisionWorker
+
+    worker = VisionWorker(0)
+    session = VisionSession()
+
+    # offline has no latency budget: always analyze at full quality
+    worker.tuner.budget_ms = 0
+    timeline = []
+    next_entry = start
+    next_sample = start
+    period = 1 / sample_fps
+    last = None
+
+    cap = cv2.VideoCapture(path)
+    seeked = start > 0
+    if seeked:
+        cap.set(cv2.CAP_PROP_POS_MSEC, start * 1000)
+
+    while cap.grab():
+
+        # the frame's own timestamp: frames are not evenly spaced
+        t = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+
+        # a seek may stop at an earlier keyframe (those frames are
+        # skipped below) but must not pass the chunk start, or frames
+        # would be lost; decode from the beginning instead
+        if seeked:
+            seeked = False
+            if t > start + SEEK_TOLERANCE:
+                print(f"⚠️ Seek to {start:.2f}s landed at {t:.2f}s, decoding from the start")
+                cap.release()
+                cap = cv2.VideoCapture(path)
+                continue
+
+        if t < start:
+            continue
+        if stop is not None and t >= stop:
+            break
+
+        last = t
+
+        if t < next_sample - SEEK_TOLERANCE:
+            continue
+
+        next_sample += period
+        if next_sample <= t:
+            # a gap in the stream: restart the sampling grid after it
+            next_sample = t + period
+
+        ok, frame = cap.retrieve()
+        if not ok:
+            continue
+
+        result = worker.analyze(session, frame, t)
+
+        if t >= next_entry:
+            timeline.append({
+                "time": round(t, 2),
+                "posture_status": result["posture_status"],
+                "eye_status": result["eye_status"],
+                "gesture_status": result["gesture_status"],
+                "posture_score": result["posture_score"],
+                "eye_score": result["eye_score"],
+                "gesture_score": result["gesture_score"],
+            })
+            next_entry = t + TIMELINE_EVERY
+
+    cap.release()
+
+    return session.score_state, timeline, last
+
+
+def analyze_recording(path, processes=None, chunk_seconds=CHUNK_SECONDS, sample_fps=SAMPLE_FPS):
+    """
+    Re-score a recorded session. The video is split into chunks that
+    are decoded and analyzed in parallel processes; chunk aggregates
+    are merged into the same scores compute_scores() returns for a
+    live session, plus a per-second feedback timeline.
+
+    Tracker smoothing restarts at each chunk boundary, which only
+    affects the first few frames of every chunk.
+    """
+
+    from camera_server import summarize_scores
+
+    fps, duration = _video_info(path)
+
+    # chunks split by time, not frame index: the frame rate varies
+    starts = [i * chunk_seconds for i in range(max(1, math.ceil(duration / chunk_seconds)))]
+    ranges = list(zip(starts, starts[1:] + [None]))
+    processes = processes or os.cpu_count() or 1
+
+    # spawn: MediaPipe graphs and the server's threads don't survive fork
+    ctx = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=min(processes, len(ranges) or 1), mp_context=ctx) as ex:
+        futures = [
+            ex.submit(_analyze_chunk, path, start, stop, sample_fps)
+            for start, stop in ranges
+        ]
+        parts = [f.result() for f in futures]
+
+    score_state = None
+    timeline = []
+    last = None
+
+    for part_scores, part_timeline, part_last in parts:
+        if score_state is None:
+            score_state = part_scores
+        else:
+            for k in score_state:
+                score_state[k].merge(part_scores[k])
+        timeline.extend(part_timeline)
+        if part_last is not None:
+            last = part_last
+
+    if score_state is None:
+        from camera_server import VisionSession
+        score_state = VisionSession().score_state
+
+    return {
+        "scores": summarize_scores(score_state),
+        "stats": {k: agg.summary() for k, agg in score_state.items()},
+        "timeline": timeline,
+        "frames_analyzed": score_state["posture"].count,
+        "duration": round(last + 1 / fps, 2) if last is not None else 0.0,
+    }
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) < 2:
+        print("usage: python offline_analyzer.py <video> [processes]")
+        sys.exit(1)
+
+    report = analyze_recording(
+        sys.argv[1],
+        processes=int(sys.argv[2]) if len(sys.argv) > 2 else None,
+    )
+    print(json.dumps(report, indent=2))
@@ -2,22 +2,21 @@ import numpy as np
 from collections import deque
 
 TILT_THRESHOLD = 14
+SHOULDER_THRESHOLD = 0.05   # normalized y difference between shoulders
 SMOOTHING_WINDOW = 15
 
-angle_buffer = deque(maxlen=SMOOTHING_WINDOW)
-
 
 def get_torso_angle(lm):
+    """
+    lm: (33, >=2) array of normalized pose landmarks.
+    """
 
-    ms_x = (lm[11].x + lm[12].x) / 2
-    ms_y = (lm[11].y + lm[12].y) / 2
+    ms = lm[[11, 12], :2].mean(axis=0, dtype=np.float64)
+    mh = lm[[23, 24], :2].mean(axis=0, dtype=np.float64)
 
-    mh_x = (lm[23].x + lm[24].x) / 2
-    mh_y = (lm[23].y + lm[24].y) / 2
+    dx, dy = np.abs(ms - mh)
 
-    return np.degrees(
-        np.arctan2(abs(ms_x - mh_x), abs(ms_y - mh_y))
-    )
+    return float(np.degrees(np.arctan2(dx, dy)))
 
 
 class PostureTracker:
@@ -25,25 +24,24 @@ class PostureTracker:
     def __init__(self):
         self.good = 0
         self.total = 0
+        self.angle_buffer = deque(maxlen=SMOOTHING_WINDOW)
 
-    def analyze(self, pose_landmarks):
+    def analyze(self, pose):
 
         posture_status = "NO BODY"
         avg_angle = 0
         current_frame_score = 0  # Score for THIS frame (0-100)
 
-        if pose_landmarks:
-
-            lm = pose_landmarks.landmark
+        if pose is not None:
 
-            ang = get_torso_angle(lm)
-            angle_buffer.append(ang)
+            ang = get_torso_angle(pose)
+            self.angle_buffer.append(ang)
 
-            avg_angle = sum(angle_buffer) / len(angle_buffer)
+            avg_angle = sum(self.angle_buffer) / len(self.angle_buffer)
 
-            shoulder_diff = abs(lm[11].y - lm[12].y)
+            shoulder_diff = abs(pose[11, 1] - pose[12, 1])
 
-            if avg_angle > TILT_THRESHOLD or shoulder_diff > 0.05:
+            if avg_angle > TILT_THRESHOLD or shoulder_diff > SHOULDER_THRESHOLD:
                 posture_status = "BAD"
                 current_frame_score = 20  # Poor posture = 20%
             else:
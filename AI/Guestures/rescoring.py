@@ -0,0 +1,219 @@
+import json
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from posture import TILT_THRESHOLD, SMOOTHING_WINDOW, SHOULDER_THRESHOLD
+from eye_contact import GOOD_RATIO
+from gesture import KEYPOINTS, MOTION_THRESHOLD, IDLE_SECONDS
+from landmark_store import load_timeline, RAN_POSE, RAN_FACE, RAN_HANDS
+from score_stats import WEIGHTS
+
+# ----------------------------
+# CONFIG
+# ----------------------------
+
+@dataclass(frozen=True)
+class ScoringConfig:
+    """
+    Every threshold and score the live trackers use. The defaults
+    reproduce the live scores; dataclasses.replace() one field to run
+    an experiment.
+    """
+
+    # posture
+    tilt_threshold: float = TILT_THRESHOLD
+    smoothing_window: int = SMOOTHING_WINDOW
+    shoulder_threshold: float = SHOULDER_THRESHOLD
+    posture_good: float = 100
+    posture_bad: float = 20
+
+    # eye contact
+    good_ratio: tuple = GOOD_RATIO
+    ideal_ratio: float = 0.5
+    ratio_falloff: float = 200     # score lost per unit of ratio off ideal
+
+    # gestures
+    motion_threshold: float = MOTION_THRESHOLD
+    idle_seconds: float = IDLE_SECONDS
+    gesture_moving: float = 100
+    gesture_idle: float = 50
+
+    weights: dict = field(default_factory=lambda: dict(WEIGHTS))
+
+
+# ----------------------------
+# HELPERS
+# ----------------------------
+
+def _last_index(mask):
+    """
+    For every row, the index of the latest row <= it where mask is
+    True, or -1 before the first one.
+    """
+
+    idx = np.where(mask, np.arange(len(mask)), -1)
+    return np.maximum.accumulate(idx) if len(idx) else idx
+
+
+def _carry(values, mask, default=0.0):
+    """
+    Forward-fill values[mask] over the rows where mask is False, the
+    way the live session reuses the last output of a skipped model.
+    """
+
+    idx = _last_index(mask)
+    return np.where(idx >= 0, values[np.maximum(idx, 0)], default)
+
+
+def _rolling_mean(values, window):
+    """
+    Mean of the last `window` values (fewer at the start), like the
+    tracker's smoothing deque.
+    """
+
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    hi = np.arange(1, len(values) + 1)
+    lo = np.maximum(hi - window, 0)
+
+    return (csum[hi] - csum[lo]) / (hi - lo)
+
+# ----------------------------
+# PER-METRIC SCORES
+# ----------------------------
+
+def posture_scores(tl, config):
+
+    pose = tl["pose"].astype(np.float64)
+    ran = (tl["ran"] & RAN_POSE) > 0
+    seen = ran & ~np.isnan(pose[:, 11, 0])
+
+    scores = np.zeros(len(tl))
+
+    # the smoothing window only ever holds frames with a body in them
+    ms = pose[seen][:, [11, 12], :2].mean(axis=1)
+    mh = pose[seen][:, [23, 24], :2].mean(axis=1)
+    dx, dy = np.abs(ms - mh).T
+    avg = _rolling_mean(np.degrees(np.arctan2(dx, dy)), config.smoothing_window)
+
+    shoulder_diff = np.abs(pose[seen, 11, 1] - pose[seen, 12, 1])
+    bad = (avg > config.tilt_threshold) | (shoulder_diff > config.shoulder_threshold)
+    scores[seen] = np.where(bad, config.posture_bad, config.posture_good)
+
+    # unseen rows where pose ran stay 0 ("NO BODY")
+    return _carry(scores, ran)
+
+
+def eye_scores(tl, config):
+
+    # x of the left iris and eye corners, see landmark_store.FACE_IDS
+    face = tl["face"][:, [0, 2, 3], 0].astype(np.float64)
+    ran = (tl["ran"] & RAN_FACE) > 0
+    seen = ran & ~np.isnan(face[:, 1])
+    iris = seen & ~np.isnan(face[:, 0])
+
+    # unrefined frames carry the ratio of the last refined one
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = (face[:, 0] - face[:, 1]) / (face[:, 2] - face[:, 1])
+    ratio = _carry(ratio, iris, default=np.nan)
+
+    lo, hi = config.good_ratio
+    off = np.maximum(0, 100 - np.abs(ratio - config.ideal_ratio) * config.ratio_falloff)
+    scores = np.where((lo < ratio) & (ratio < hi), 100.0, off)
+    scores = np.where(seen & ~np.isnan(ratio), scores, 0.0)
+
+    return _carry(scores, ran)
+
+
+def gesture_scores(tl, config):
+
+    ran = (tl["ran"] & RAN_HANDS) > 0
+
+    # pixels at the size of the frame the hands were found in; held
+    # frames keep those pixels, like GestureTracker.hold()
+    kp = tl["hands"][:, :, KEYPOINTS].astype(np.float64)
+    count = (~np.isnan(kp[:, :, 0, 0])).sum(axis=1)
+    wh = tl["wh"][:, None, None, :].astype(np.float64)
+    px = np.trunc(np.nan_to_num(kp) * wh)
+
+    src = np.maximum(_last_index(ran), 0)
+    px, count = px[src], np.where(_last_index(ran) >= 0, count[src], 0)
+
+    prev_px = np.roll(px, 1, axis=0)
+    prev_count = np.roll(count, 1)
+    prev_count[:1] = 0
+
+    # hands pair up in detection order; only pairs present in both count
+    dist = np.hypot(*(px - prev_px).transpose(3, 0, 1, 2)).mean(axis=2)
+    paired = np.arange(px.shape[1]) < np.minimum(count, prev_count)[:, None]
+    moving = ((dist > config.motion_threshold) & paired).any(axis=1)
+
+    moved = moving | ((count > 0) & (prev_count == 0))
+    last_move = _last_index(moved)
+    t = tl["t"].astype(np.float64)
+    idle = np.where(last_move >= 0, t - t[np.maximum(last_move, 0)], np.inf)
+
+    return np.where(
+        idle > config.idle_seconds, 0.0,
+        np.where(moving, config.gesture_moving, config.gesture_idle),
+    )
+
+# ----------------------------
+# SESSION RE-SCORING
+# ----------------------------
+
+def rescore_timeline(tl, config=None, per_frame=False):
+    """
+    Recompute a whole session from its stored landmark timeline in one
+    vectorized pass. Returns the compute_scores() dict, plus the frame
+    score arrays when per_frame is set.
+    """
+
+    config = config or ScoringConfig()
+
+    frames = {
+        "posture": posture_scores(tl, config),
+        "eye": eye_scores(tl, config),
+        "gesture": gesture_scores(tl, config),
+    }
+
+    scores = {
+        k: round(float(v.mean()), 1) if len(v) else 0
+        for k, v in frames.items()
+    }
+    scores["overall"] = round(
+        sum(scores[k] * w for k, w in config.weights.items()), 1
+    )
+
+    if per_frame:
+        scores["frames"] = frames
+
+    return scores
+
+
+def rescore_sessions(sessions, config=None):
+    """
+    Re-score many sessions (ids or timeline paths) with one config.
+    Timelines are memory-mapped, so only one is paged in at a time.
+    """
+
+    results = {}
+
+    for s in sessions:
+        try:
+            results[s] = rescore_timeline(load_timeline(s), config)
+        except FileNotFoundError:
+            print(f"⚠️ No landmark timeline for {s}")
+
+    return results
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) < 2:
+        print("usage: python rescoring.py <session_id | timeline.npy> ...")
+        sys.exit(1)
+
+    targets = [int(a) if a.isdigit() else a for a in sys.argv[1:]]
+    print(json.dumps(rescore_sessions(targets), indent=2, default=str))
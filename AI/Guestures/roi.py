@@ -0,0 +1,148 @@
+import cv2
+import numpy as np
+
+# ----------------------------
+# POSE LANDMARK GROUPS
+# ----------------------------
+
+FACE_POINTS = list(range(0, 11))    # nose, eyes, ears, mouth
+HAND_POINTS = [
+    15, 17, 19, 21,                 # left wrist, pinky, index, thumb
+    16, 18, 20, 22,                 # right wrist, pinky, index, thumb
+]
+
+MIN_VISIBILITY = 0.5
+
+FACE_SCALE = 2.2     # pose face points cover eyes-to-mouth, grow to full head
+HAND_RADIUS = 0.6    # hand box half-size, in shoulder widths
+MAX_SIDE = 320       # crops are downscaled to at most this many pixels
+ALIGN = 16           # snap boxes to a grid so they do not jitter per frame
+
+
+def _visible_px(pose, ids, w, h):
+    """
+    Pixel (x, y) of the listed pose points that are visible.
+    pose is the (33, 4) x / y / z / visibility array.
+    """
+
+    pts = pose[ids]
+    pts = pts[pts[:, 3] > MIN_VISIBILITY, :2]
+
+    return pts * (w, h)
+
+
+def _box(cx, cy, half_w, half_h, w, h):
+
+    x0 = int(max(0, cx - half_w) // ALIGN * ALIGN)
+    y0 = int(max(0, cy - half_h) // ALIGN * ALIGN)
+    x1 = int(min(w, -(-(cx + half_w) // ALIGN) * ALIGN))
+    y1 = int(min(h, -(-(cy + half_h) // ALIGN) * ALIGN))
+
+    if x1 - x0 < ALIGN or y1 - y0 < ALIGN:
+        return None
+
+    return x0, y0, x1, y1
+
+
+def face_roi(pose, frame_shape):
+    """
+    Square box around the head in pixels, or None if the pose graph
+    did not see the face.
+    """
+
+    if pose is None:
+        return None
+
+    h, w = frame_shape[:2]
+    pts = _visible_px(pose, FACE_POINTS, w, h)
+
+    if len(pts) < 3:
+        return None
+
+    lo, hi = pts.min(axis=0), pts.max(axis=0)
+    half = (hi - lo).max() * FACE_SCALE / 2
+    cx, cy = (lo + hi) / 2
+
+    return _box(cx, cy, half, half, w, h)
+
+
+def hands_roi(pose, frame_shape):
+    """
+    One box covering every visible hand, or None when neither hand
+    is visible to the pose graph.
+    """
+
+    if pose is None:
+        return None
+
+    h, w = frame_shape[:2]
+    pts = _visible_px(pose, HAND_POINTS, w, h)
+
+    if not len(pts):
+        return None
+
+    shoulder_w = abs(pose[11, 0] - pose[12, 0]) * w
+    radius = max(shoulder_w * HAND_RADIUS, 48)
+
+    lo, hi = pts.min(axis=0), pts.max(axis=0)
+    cx, cy = (lo + hi) / 2
+    half_w, half_h = (hi - lo) / 2 + radius
+
+    return _box(cx, cy, half_w, half_h, w, h)
+
+
+def crop(rgb, box, out=None):
+    """
+    Crop and, if needed, downscale so the longest side is MAX_SIDE.
+    Landmarks come back normalized to the crop, so scaling is free.
+    `out` is an optional flat uint8 buffer of at least MAX_SIDE^2 * 3
+    bytes to write the crop into instead of a new array.
+    """
+
+    x0, y0, x1, y1 = box
+    roi = rgb[y0:y1, x0:x1]
+
+    scale = MAX_SIDE / max(roi.shape[:2])
+
+    if out is None:
+        if scale < 1:
+            roi = cv2.resize(roi, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        # MediaPipe wants a contiguous buffer
+        return np.ascontiguousarray(roi)
+
+    h, w = roi.shape[:2]
+    if scale < 1:
+        h, w = round(h * scale), round(w * scale)
+
+    # the head of a flat buffer is a contiguous (h, w, 3) array
+    view = out[:h * w * 3].reshape(h, w, 3)
+
+    if scale < 1:
+        cv2.resize(roi, None, dst=view, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    else:
+        np.copyto(view, roi)
+
+    return view
+
+
+def to_frame_coords(points, box, frame_shape):
+    """
+    Map crop-normalized landmarks (any array ending in x, y, z) back to
+    full-frame normalized coordinates in place, so downstream ratios
+    and pixel distances are unchanged.
+    """
+
+    if points is None or not points.size:
+        return points
+
+    h, w = frame_shape[:2]
+    x0, y0, x1, y1 = box
+    sx = (x1 - x0) / w
+    sy = (y1 - y0) / h
+
+    points[..., 0] = points[..., 0] * sx + x0 / w
+    points[..., 1] = points[..., 1] * sy + y0 / h
+    points[..., 2] *= sx
+
+    return points
@@ -0,0 +1,155 @@
+import os
+
+import cv2
+import numpy as np
+
+# ----------------------------
+# DEFAULT RATES
+# ----------------------------
+
+POSE_EVERY = 3          # posture drifts slowly
+FACE_EVERY = 1          # eye contact changes fast
+HANDS_MOTION_THRESHOLD = 2.0   # mean abs diff (0-255) on the thumbnail
+HANDS_MAX_SKIP = 15     # refresh hands at least this often anyway
+
+MOTION_SIZE = (32, 24)
+
+# a frame whose thumbnail differs from the last analyzed one by less
+# than this is treated as a repeat; 0 disables the check
+DUPLICATE_THRESHOLD = float(os.getenv("VISION_DUPLICATE_THRESHOLD", "0.5"))
+DUPLICATE_MAX_SKIP = 5  # gaze shifts are invisible at thumbnail size,
+                        # so re-run the graphs at least this often
+
+
+def motion_thumbnail(frame):
+    """
+    Tiny grayscale copy of the frame, cheap enough to diff every frame.
+    """
+
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, MOTION_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def frame_motion(prev_thumb, thumb):
+
+    if prev_thumb is None:
+        return float("inf")
+
+    return float(np.mean(cv2.absdiff(prev_thumb, thumb)))
+
+
+def keep_thumb(kept, thumb):
+    """
+    Copy a thumbnail that is kept across frames: the caller's may be a
+    reused FrameContext buffer. Writes into `kept` when it fits.
+    """
+
+    if kept is None or kept.shape != thumb.shape:
+        return thumb.copy()
+
+    np.copyto(kept, thumb)
+    return kept
+
+
+class FrameScheduler:
+    """
+    Decides which models run on the current frame. Models that are
+    skipped reuse their last output (hands: scored as "not moved").
+    """
+
+    def __init__(
+        self,
+        pose_every=POSE_EVERY,
+        face_every=FACE_EVERY,
+        hands_motion_threshold=HANDS_MOTION_THRESHOLD,
+        hands_max_skip=HANDS_MAX_SKIP,
+    ):
+        self.pose_every = pose_every
+        self.face_every = face_every
+        self.hands_motion_threshold = hands_motion_threshold
+        self.hands_max_skip = hands_max_skip
+
+        self.reset()
+
+    def reset(self):
+        self.frame_index = 0
+        self.prev_thumb = None
+        self.frames_since_hands = 0
+        self.motion = 0.0
+
+    def plan(self, frame, thumb=None):
+
+        if thumb is None:
+            thumb = motion_thumbnail(frame)
+        self.motion = frame_motion(self.prev_thumb, thumb)
+        self.prev_thumb = keep_thumb(self.prev_thumb, thumb)
+
+        first = self.frame_index == 0
+
+        run_hands = (
+            first
+            or self.motion >= self.hands_motion_threshold
+            or self.frames_since_hands >= self.hands_max_skip
+        )
+
+        plan = {
+            "pose": first or self.frame_index % self.pose_every == 0,
+            "face": first or self.frame_index % self.face_every == 0,
+            "hands": run_hands,
+        }
+
+        self.frames_since_hands = 0 if run_hands else self.frames_since_hands + 1
+        self.frame_index += 1
+
+        return plan
+
+
+class DuplicateFilter:
+    """
+    Flags frames that are near-identical to the last frame that went
+    through inference, so their tracker outputs can be reused. The
+    comparison is against that reference, not the previous frame, so
+    slow drift still adds up to a change.
+    """
+
+    def __init__(self, threshold=DUPLICATE_THRESHOLD, max_skip=DUPLICATE_MAX_SKIP):
+        self.threshold = threshold
+        self.max_skip = max_skip
+
+        self.reset()
+
+    def reset(self):
+        self.ref_thumb = None
+        self.skipped = 0
+        self.checked = 0
+        self.hits = 0
+        self.diff = 0.0
+
+    def check(self, thumb):
+        """
+        True if the frame can reuse the previous outputs.
+        """
+
+        self.checked += 1
+        self.diff = frame_motion(self.ref_thumb, thumb)
+
+        if self.diff < self.threshold and self.skipped < self.max_skip:
+            self.skipped += 1
+            self.hits += 1
+            return True
+
+        self.ref_thumb = keep_thumb(self.ref_thumb, thumb)
+        self.skipped = 0
+        return False
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.checked if self.checked else 0.0
+
+    def stats(self):
+        return {
+            "frames": self.checked,
+            "duplicates": self.hits,
+            "hit_rate": round(self.hit_rate, 3),
+            "threshold": self.threshold,
+        }
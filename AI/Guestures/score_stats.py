@@ -0,0 +1,79 @@
+import numpy as np
+
+HISTOGRAM_BINS = 10   # 0-10, 10-20, ... 90-100
+
+# overall score weights of the final report, used live and in rescoring
+WEIGHTS = {
+    "posture": 0.4,
+    "eye": 0.35,
+    "gesture": 0.25,
+}
+
+
+class ScoreAggregator:
+    """
+    Constant-memory replacement for a per-frame score list: keeps
+    count, running sum (mean), min/max and a 10-bin histogram of the
+    0-100 frame scores.
+
+    The mean is total / count with the same left-to-right summation
+    as sum(list), so averages match the old list-based code exactly.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.histogram = np.zeros(HISTOGRAM_BINS, dtype=np.int64)
+
+    def add(self, value):
+
+        self.count += 1
+        self.total += value
+
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        idx = min(max(int(value // (100 / HISTOGRAM_BINS)), 0), HISTOGRAM_BINS - 1)
+        self.histogram[idx] += 1
+
+    def merge(self, other):
+        """
+        Fold in another aggregator, e.g. one per offline video chunk.
+        """
+
+        self.count += other.count
+        self.total += other.total
+        self.histogram += other.histogram
+
+        for v in (other.min, other.max):
+            if v is None:
+                continue
+            if self.min is None or v < self.min:
+                self.min = v
+            if self.max is None or v > self.max:
+                self.max = v
+
+        return self
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 2),
+            "min": self.min if self.min is not None else 0,
+            "max": self.max if self.max is not None else 0,
+            "histogram": self.histogram.tolist(),
+        }
@@ -0,0 +1,138 @@
+import time
+
+import numpy as np
+
+from pitch_analyzer import FMIN
+
+
+class BlockFeatures:
+    """
+    Everything computed from one audio block, once, and read by every
+    consumer (pause detection, speaking flag, loudness, pitch).
+
+      block     the block's samples (1-D)
+      frame     overlap tail + block, the pitch analysis frame
+      energy    cumulative sum of squares of frame, with a leading 0,
+                so the energy of any span is two lookups
+      spectrum  rfft of frame, zero-padded to a power of two
+      rms       RMS of the block
+      zcr       zero crossings per sample of the block
+    """
+
+    __slots__ = ("block", "frame", "energy", "spectrum", "rms", "zcr")
+
+    def __init__(self, block, frame, energy, spectrum, rms, zcr):
+        self.block = block
+        self.frame = frame
+        self.energy = energy
+        self.spectrum = spectrum
+        self.rms = rms
+        self.zcr = zcr
+
+
+class FeatureExtractor:
+    """
+    Per-block feature stage. Keeps the last `overlap` samples of the
+    stream so the frame (and its spectrum) covers the longest pitch
+    period on top of a full block, the layout StreamingYin expects.
+    """
+
+    def __init__(self, sample_rate=16000, overlap=None):
+
+        self.sample_rate = sample_rate
+        self.overlap = overlap if overlap is not None else int(np.ceil(sample_rate / FMIN))
+
+        self.reset()
+
+    def reset(self):
+        self.tail = np.zeros(self.overlap, dtype=np.float32)
+
+    def process(self, block):
+
+        frame = np.concatenate((self.tail, block))
+        self.tail = frame[-self.overlap:].copy()
+
+        energy = np.concatenate(([0.0], np.cumsum(frame.astype(np.float64) ** 2)))
+        block_energy = energy[-1] - energy[self.overlap]
+        rms = float(np.sqrt(block_energy / len(block))) if len(block) else 0.0
+
+        signs = np.signbit(block)
+        zcr = float(np.count_nonzero(signs[1:] != signs[:-1]) / len(block)) if len(block) else 0.0
+
+        size = 1 << (len(frame) - 1).bit_length()
+        spectrum = np.fft.rfft(frame, size)
+
+        return BlockFeatures(block, frame, energy, spectrum, rms, zcr)
+
+
+# ---------------- BENCHMARK ----------------
+
+def benchmark(seconds=30.0, sample_rate=16000, block=1024):
+    """
+    CPU per second of audio of main_server's per-block analysis, with
+    every consumer computing its own RMS / transform (separate) and
+    with one FeatureExtractor pass shared by all of them (shared).
+    """
+
+    from pause_detector import PauseDetector
+    from pitch_analyzer import PitchAnalyzer, synthetic_tone
+
+    # speech-like: voiced stretches at a few pitches with silent gaps
+    rng = np.random.default_rng(0)
+    parts = []
+    for f0 in (110, 140, 180, 220):
+        parts.append(synthetic_tone(f0, seconds / 8, sample_rate))
+        parts.append((0.001 * rng.standard_normal(int(seconds / 8 * sample_rate))).astype(np.float32))
+    audio = np.concatenate(parts)
+    blocks = [audio[i:i + block] for i in range(0, len(audio) - block + 1, block)]
+
+    def separate():
+        pause, pitch = PauseDetector(), PitchAnalyzer(sample_rate, "yin")
+        out = []
+        for flat in blocks:
+            pause.process_audio(flat, 0.0)
+            speaking = np.sqrt(np.mean(flat ** 2)) >= pause.silence_threshold
+            out.append((speaking, pitch.loudness(flat), pitch.pitch(flat)))
+        return out
+
+    def shared():
+        pause, pitch = PauseDetector(), PitchAnalyzer(sample_rate, "yin")
+        features = FeatureExtractor(sample_rate, pitch.yin.max_lag)
+        out = []
+        for flat in blocks:
+            f = features.process(flat)
+            pause.process_audio(flat, 0.0, f.rms)
+            speaking = f.rms >= pause.silence_threshold
+            out.append((speaking, pitch.loudness(flat, f), pitch.pitch(flat, f)))
+        return out
+
+    results = {}
+    outputs = {}
+
+    for name, run in (("separate", separate), ("shared", shared)):
+        run()   # warm up
+        start = time.process_time()
+        repeats = 5
+        for _ in range(repeats):
+            outputs[name] = run()
+        cpu = (time.process_time() - start) / repeats
+
+        results[name] = {
+            "cpu_ms_per_audio_second": round(1000 * cpu / (len(blocks) * block / sample_rate), 3),
+            "us_per_block": round(1e6 * cpu / len(blocks), 1),
+        }
+
+    a, b = outputs["separate"], outputs["shared"]
+    results["same_outputs"] = all(
+        sa == sb and abs(la - lb) <= 1e-6 * max(la, 1e-9) and abs(pa - pb) <= 1e-6 * max(pa, 1)
+        for (sa, la, pa), (sb, lb, pb) in zip(a, b)
+    )
+
+    return results
+
+
+if __name__ == "__main__":
+
+    import json
+
+    print(json.dumps(benchmark(), indent=2))
@@ -1,5 +1,7 @@
 import sounddevice as sd
 
+BLOCK_SIZE = 1024
+
 class AudioStream:
 
     def __init__(self, sample_rate, callback):
@@ -14,7 +16,7 @@ class AudioStream:
             samplerate=self.sample_rate,
             channels=1,
             callback=self.callback,
-            blocksize=1024,
+            blocksize=BLOCK_SIZE,
         )
 
         self.stream.start()
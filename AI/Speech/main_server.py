@@ -3,10 +3,6 @@ import threading
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 
-import os
-import soundfile as sf
-import numpy as np
-
 import assemblyai as aai
 from filler_nlp import detect_fillers_from_text
 
@@ -22,23 +18,35 @@ from api_secrets import API_KEY_ASSEMBLYAI
 from pause_detector import PauseDetector
 from wpm_tracker import WPMTracker
 from pitch_analyzer import PitchAnalyzer
-from audio_stream import AudioStream
+from audio_stream import AudioStream, BLOCK_SIZE
+from ring_buffer import BlockRing
+from audio_features import FeatureExtractor
+from prosody_stats import ProsodyHistory
+from recording_writer import RecordingWriter
 
 
 # ---------------- CONFIG ----------------
 
 SAMPLE_RATE = 16000
 
+RING_BLOCKS = 128       # ~8 s of 1024-sample blocks: room for the DSP
+                        # worker to stall behind vision inference
+DSP_IDLE_WAIT = 0.01    # s the worker sleeps when the ring is empty
+
 app = FastAPI(title="Speech Analysis System")
 
 pause_detector = PauseDetector()
 wpm_tracker = WPMTracker()
 pitch_analyzer = PitchAnalyzer(SAMPLE_RATE)
 
+# one RMS / spectrum per block, read by every analyzer below
+feature_extractor = FeatureExtractor(SAMPLE_RATE, pitch_analyzer.yin.max_lag)
+
 # ---------------- AUDIO RECORDING ----------------
 
-audio_writer = None
-audio_file_path = "recordings/session_audio.wav"
+# compressed, written from its own thread; one file per session_id
+recorder = RecordingWriter(SAMPLE_RATE)
+recording_session_id = None
 
 # ---------------- SESSION STATE ----------------
 
@@ -52,58 +60,131 @@ state = {
     "pitch": 0,
     "loudness": 0,
 
-    # histories for final report
-    "pitch_history": [],
-    "loudness_history": [],
-
     "transcripts": [],
     "fillers": [],
     "pause_events": [],  # Track long pause timestamps for beep sound
     "speaking_active": False,  # Track if user is currently speaking (for beep control)
+
+    # mic blocks lost: PortAudio overflows / ring full behind a busy worker
+    "audio_overflows": 0,
+    "audio_dropped_blocks": 0,
+
+    "recording_path": None,
 }
 
+# histories for final report: float32 chunks + running stats; kept out
+# of state so /api/status sends their summaries, not every value
+pitch_history = ProsodyHistory(60, 400)
+loudness_history = ProsodyHistory(1e-5, 1.0, log=True)
+
 analysis_thread = None
 client = None
 audio_stream = None
 
+# mic blocks from the PortAudio callback to the DSP worker
+audio_ring = BlockRing(RING_BLOCKS, BLOCK_SIZE)
+dsp_thread = None
+dsp_stop = threading.Event()
+dsp_lock = threading.Lock()     # start / stop come from the API and
+                                # AssemblyAI threads
+
 
 # ---------------- AUDIO CALLBACK ----------------
 
 def audio_callback(indata, frames, time_info, status):
 
-    global audio_writer
+    # real-time thread: copy into the ring and return, nothing else;
+    # any delay here overflows the PortAudio input buffer
+    if status.input_overflow:
+        state["audio_overflows"] += 1
+
+    if not audio_ring.push(indata, time.time()):
+        state["audio_dropped_blocks"] = audio_ring.dropped
+
+
+# ---------------- AUDIO ANALYSIS ----------------
 
-    audio = indata.copy()
-    flat = audio.flatten()
+def process_block(audio, now):
 
-    # ✅ RECORD MIC
-    if audio_writer:
-        audio_writer.write(audio)
+    flat = audio[:, 0]
+
+    # ✅ RECORD MIC (queued, encoded off this thread)
+    recorder.write(audio)
+
+    features = feature_extractor.process(flat)
 
     # ---- pause detection ----
-    pause_detected = pause_detector.process_audio(flat)
+    pause_detected = pause_detector.process_audio(flat, now, features.rms)
     
     # Track if user is currently speaking (for beep control)
-    rms = np.sqrt(np.mean(flat ** 2))
-    state["speaking_active"] = bool(rms >= pause_detector.silence_threshold)
+    state["speaking_active"] = bool(features.rms >= pause_detector.silence_threshold)
     
     if pause_detected:
         state["last_pause"] = True
         # Track pause event with timestamp for beep sound
-        pause_time = round(time.time() - state["session_start"], 2) if state["session_start"] else 0
+        pause_time = round(now - state["session_start"], 2) if state["session_start"] else 0
         state["pause_events"].append({"timestamp": pause_time, "id": f"pause-{pause_time}"})
         print(f"🔔 Long pause detected at {pause_time}s")
 
     # ---- pitch + loudness ----
-    loud = pitch_analyzer.loudness(flat)
-    pitch = pitch_analyzer.pitch(flat)
+    loud = pitch_analyzer.loudness(flat, features)
+    pitch = pitch_analyzer.pitch(flat, features)
 
     if 60 <= pitch <= 400:
         state["pitch"] = round(pitch, 2)
-        state["pitch_history"].append(pitch)
+        pitch_history.append(pitch)
 
     state["loudness"] = round(loud, 5)
-    state["loudness_history"].append(loud)
+    loudness_history.append(loud)
+
+
+def dsp_worker():
+
+    # drains what is left after a stop, so the recording is complete
+    while True:
+        item = audio_ring.peek()
+
+        if item is None:
+            if dsp_stop.is_set():
+                return
+            dsp_stop.wait(DSP_IDLE_WAIT)
+            continue
+
+        try:
+            process_block(*item)
+        except Exception as e:
+            print(f"⚠️ Audio analysis error: {e}")
+        finally:
+            audio_ring.release()
+
+
+def start_dsp_worker():
+
+    global dsp_thread
+
+    with dsp_lock:
+        audio_ring.clear()
+        dsp_stop.clear()
+
+        dsp_thread = threading.Thread(target=dsp_worker, daemon=True)
+        dsp_thread.start()
+
+
+def stop_dsp_worker():
+
+    global dsp_thread
+
+    # call after the mic stream is stopped: nothing is pushed anymore.
+    # stop() and on_terminated can both get here; the second caller
+    # waits under the lock until the first has joined the worker, so
+    # neither returns while blocks are still being recorded
+    with dsp_lock:
+        dsp_stop.set()
+
+        thread = dsp_thread
+        if thread and thread is not threading.current_thread():
+            thread.join()
+        dsp_thread = None
 
 
 # ---------------- ASSEMBLY EVENTS ----------------
@@ -143,7 +224,7 @@ def on_turn(self, event):
 
 def on_begin(self, event):
 
-    global audio_stream, audio_writer
+    global audio_stream
 
     wpm_tracker.start()
 
@@ -152,18 +233,22 @@ def on_begin(self, event):
     state["transcripts"].clear()
     state["fillers"].clear()
     state["pause_events"].clear()
-    state["pitch_history"].clear()
-    state["loudness_history"].clear()
+    pitch_history.clear()
+    loudness_history.clear()
+    pitch_analyzer.reset()
+    feature_extractor.reset()
 
-    os.makedirs("recordings", exist_ok=True)
+    state["audio_overflows"] = 0
+    state["audio_dropped_blocks"] = 0
 
     # ✅ OPEN AUDIO FILE
-    audio_writer = sf.SoundFile(
-        audio_file_path,
-        mode="w",
-        samplerate=SAMPLE_RATE,
-        channels=1,
-    )
+    try:
+        state["recording_path"] = recorder.open(recording_session_id)
+    except Exception as e:
+        state["recording_path"] = None
+        print(f"⚠️ Warning opening audio file: {e}")
+
+    start_dsp_worker()
 
     # ✅ START MIC STREAM
     audio_stream = AudioStream(
@@ -181,6 +266,8 @@ def on_terminated(self, event):
     if audio_stream:
         audio_stream.stop()
 
+    stop_dsp_worker()
+
 
 # ---------------- START / STOP ----------------
 
@@ -214,7 +301,7 @@ def analysis_worker():
 @app.post("/api/start")
 def start():
 
-    global analysis_thread
+    global analysis_thread, recording_session_id
 
     if state["running"]:
         return JSONResponse({"status": "already running"})
@@ -222,6 +309,9 @@ def start():
     state["running"] = True
     state["last_pause"] = False
 
+    # standalone server: no session, the default file name
+    recording_session_id = None
+
     analysis_thread = threading.Thread(
         target=analysis_worker,
         daemon=True,
@@ -235,7 +325,7 @@ def start():
 @app.post("/api/stop")
 def stop():
 
-    global client, audio_stream, audio_writer
+    global client, audio_stream
 
     if client:
         client.disconnect(terminate=True)
@@ -244,13 +334,14 @@ def stop():
         audio_stream.stop()
         audio_stream = None
 
-    # ✅ CLOSE WAV FILE
-    if audio_writer:
-        try:
-            audio_writer.close()
-        except Exception as e:
-            print(f"⚠️ Warning closing audio file: {e}")
-        audio_writer = None
+    # the worker may still be writing queued blocks to the file
+    stop_dsp_worker()
+
+    # ✅ CLOSE AUDIO FILE (flushes what is still queued)
+    try:
+        recorder.close()
+    except Exception as e:
+        print(f"⚠️ Warning closing audio file: {e}")
 
     state["running"] = False
 
@@ -260,7 +351,11 @@ def stop():
 @app.get("/api/status")
 def status():
 
-    return JSONResponse(state)
+    return JSONResponse({
+        **state,
+        "pitch_stats": pitch_history.stats(),
+        "loudness_stats": loudness_history.stats(digits=5),
+    })
 
 
 @app.get("/api/transcripts")
@@ -281,23 +376,22 @@ def get_full_transcript():
 
 def get_pitch_stats():
 
-    if not state["pitch_history"]:
-        return {"avg": 0, "min": 0, "max": 0}
+    stats = pitch_history.stats()
 
-    vals = state["pitch_history"]
-
-    return {
-        "avg": round(sum(vals) / len(vals), 2),
-        "min": round(min(vals), 2),
-        "max": round(max(vals), 2),
-    }
+    return {"avg": stats["avg"], "min": stats["min"], "max": stats["max"]}
 
 
 # ---------------- MASTER CONTROL ----------------
 
-def start_speech_system():
+def start_speech_system(session_id=None):
+    """
+    session_id names the session's audio file, so each recording
+    gets its own file instead of overwriting the last one.
+    """
+
+    global analysis_thread, recording_session_id
 
-    global analysis_thread
+    recording_session_id = session_id
 
     analysis_thread = threading.Thread(
         target=analysis_worker,
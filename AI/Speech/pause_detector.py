@@ -9,10 +9,15 @@ class PauseDetector:
         self.silent_start = None
         self.alerted = False
 
-    def process_audio(self, audio_chunk):
+    def process_audio(self, audio_chunk, now=None, rms=None):
 
-        rms = np.sqrt(np.mean(audio_chunk ** 2))
-        now = time.time()
+        # rms may come precomputed from audio_features
+        if rms is None:
+            rms = np.sqrt(np.mean(audio_chunk ** 2))
+
+        # capture time of the chunk when it was queued before analysis
+        if now is None:
+            now = time.time()
 
         if rms < self.silence_threshold:
             if self.silent_start is None:
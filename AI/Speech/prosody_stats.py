@@ -0,0 +1,137 @@
+import math
+import threading
+from array import array
+
+import numpy as np
+
+CHUNK = 4096            # values per array('f') chunk, 16 KiB
+QUANTILES = (10, 50, 90)
+
+
+class ProsodyHistory:
+    """
+    Per-block pitch or loudness values for a whole session, kept as
+    float32 in fixed-size array('f') chunks (4 bytes a value instead of
+    a boxed float in a list) with running statistics, so stats() never
+    scans the history:
+
+      Welford mean / variance, min / max: exact
+      quantiles: from a fixed-bin histogram over [lo, hi], accurate to
+                 a bin; values outside the range count in the end bins
+
+    log=True spaces the bins logarithmically, for loudness RMS which
+    spans several decades. append() runs on the audio worker while the
+    API threads read stats(), hence the lock.
+    """
+
+    def __init__(self, lo, hi, bins=256, log=False):
+
+        self.log = log
+        self.edges = np.geomspace(lo, hi, bins + 1) if log else np.linspace(lo, hi, bins + 1)
+
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+
+        with self.lock:
+            self.chunks = [array("f")]
+            self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+
+            self.count = 0
+            self.mean = 0.0
+            self.m2 = 0.0
+            self.min = math.inf
+            self.max = -math.inf
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value):
+
+        value = float(value)
+
+        with self.lock:
+            chunk = self.chunks[-1]
+            if len(chunk) >= CHUNK:
+                chunk = array("f")
+                self.chunks.append(chunk)
+            chunk.append(value)
+
+            # Welford
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+
+            i = int(np.searchsorted(self.edges, value, side="right")) - 1
+            self.counts[min(max(i, 0), len(self.counts) - 1)] += 1
+
+    def values(self):
+        """
+        The whole history as one float32 array (a copy).
+        """
+
+        with self.lock:
+            return np.concatenate([np.frombuffer(c, dtype=np.float32) for c in self.chunks])
+
+    def quantile(self, q):
+        """
+        q in [0, 100], interpolated inside the histogram bin it falls in
+        and clamped to the exact min / max.
+        """
+
+        with self.lock:
+            return self._quantile(q, np.cumsum(self.counts))
+
+    def _quantile(self, q, cum):
+
+        if not self.count:
+            return 0.0
+
+        target = q / 100 * self.count
+        i = min(int(np.searchsorted(cum, target, side="left")), len(cum) - 1)
+
+        below = cum[i] - self.counts[i]
+        frac = (target - below) / self.counts[i] if self.counts[i] else 0.0
+
+        lo, hi = self.edges[i], self.edges[i + 1]
+        value = lo * (hi / lo) ** frac if self.log else lo + (hi - lo) * frac
+
+        return float(min(max(value, self.min), self.max))
+
+    def stats(self, digits=2):
+        """
+        JSON-ready summary; all zeros for an empty history.
+        """
+
+        with self.lock:
+
+            if not self.count:
+                return {
+                    "count": 0, "avg": 0, "std": 0, "min": 0, "max": 0,
+                    **{f"p{q}": 0 for q in QUANTILES},
+                }
+
+            std = math.sqrt(self.m2 / self.count)
+            cum = np.cumsum(self.counts)
+
+            return {
+                "count": self.count,
+                "avg": round(self.mean, digits),
+                "std": round(std, digits),
+                "min": round(self.min, digits),
+                "max": round(self.max, digits),
+                **{f"p{q}": round(self._quantile(q, cum), digits) for q in QUANTILES},
+            }
+
+    def nbytes(self):
+        """
+        Memory held by the values and the histogram.
+        """
+
+        with self.lock:
+            return sum(c.buffer_info()[1] * c.itemsize for c in self.chunks) + self.counts.nbytes
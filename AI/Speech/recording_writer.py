@@ -0,0 +1,156 @@
+import os
+import queue
+import threading
+
+import numpy as np
+import soundfile as sf
+
+# ---------------- CONFIG ----------------
+
+# name: (libsndfile format, subtype, extension)
+RECORDING_FORMATS = {
+    "flac": ("FLAC", "PCM_16", ".flac"),   # lossless, ~half of WAV
+    "opus": ("OGG", "OPUS", ".opus"),      # speech-grade, ~1/20 of WAV;
+                                           # needs libsndfile >= 1.0.29
+    "wav": ("WAV", "PCM_16", ".wav"),
+}
+RECORDING_FORMAT = os.getenv("SPEECH_RECORDING_FORMAT", "flac")
+
+RECORDING_DIR = "recordings"
+
+FLUSH_SECONDS = 5.0     # audio gathered before each encode + write
+QUEUE_BLOCKS = 512      # ~32 s of 1024-sample blocks waiting on the disk
+
+
+def recording_path(session_id, fmt=RECORDING_FORMAT, directory=RECORDING_DIR):
+
+    name = "session_audio" if session_id is None else f"session_audio_{session_id}"
+
+    return os.path.join(directory, name + RECORDING_FORMATS[fmt][2])
+
+
+class RecordingWriter:
+    """
+    Session audio recorder. write() only queues a copy of the block; a
+    writer thread gathers FLUSH_SECONDS of audio and hands it to the
+    encoder in one call, so compression and file-system latency never
+    reach the audio path. open() rotates to a new file per session_id.
+    """
+
+    def __init__(self, sample_rate, fmt=RECORDING_FORMAT, directory=RECORDING_DIR,
+                 flush_seconds=FLUSH_SECONDS):
+
+        if fmt not in RECORDING_FORMATS:
+            raise ValueError(f"Unknown recording format: {fmt}")
+
+        self.sample_rate = sample_rate
+        self.fmt = fmt
+        self.directory = directory
+        self.flush_frames = int(flush_seconds * sample_rate)
+
+        self.path = None
+        self.queue = None
+        self.thread = None
+        self.dropped = 0
+
+    @property
+    def recording(self):
+        return self.thread is not None
+
+    def open(self, session_id=None):
+        """
+        Close the current file, if any, and start recording session_id.
+        """
+
+        self.close()
+
+        fmt, subtype, _ = RECORDING_FORMATS[self.fmt]
+        path = recording_path(session_id, self.fmt, self.directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+        # opened here so a bad path / format fails the caller, not the thread
+        f = sf.SoundFile(
+            path,
+            mode="w",
+            samplerate=self.sample_rate,
+            channels=1,
+            format=fmt,
+            subtype=subtype,
+        )
+
+        self.path = path
+        self.dropped = 0
+        self.queue = queue.Queue(maxsize=QUEUE_BLOCKS)
+        self.thread = threading.Thread(target=self._run, args=(f, self.queue), daemon=True)
+        self.thread.start()
+
+        return path
+
+    def write(self, block):
+        """
+        Queue a (frames, 1) block. Never waits: if the disk is so far
+        behind that the queue is full, the block is dropped and counted.
+        """
+
+        if self.queue is None:
+            return
+
+        try:
+            # the caller's buffer is reused for the next block
+            self.queue.put_nowait(block.copy())
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """
+        Write out everything queued and finalize the file.
+        """
+
+        if self.thread is None:
+            return
+
+        self.queue.put(None)
+        self.thread.join()
+
+        if self.dropped:
+            print(f"⚠️ Recording {self.path}: dropped {self.dropped} blocks")
+
+        self.thread = None
+        self.queue = None
+
+    def _run(self, f, q):
+
+        buffer = np.empty((self.flush_frames, 1), dtype=np.float32)
+        filled = 0
+
+        try:
+            while True:
+                block = q.get()
+                if block is None:
+                    break
+
+                block = block.reshape(len(block), -1)[:, :1]
+
+                # blocks can straddle a flush boundary
+                while len(block):
+                    n = min(len(block), self.flush_frames - filled)
+                    buffer[filled:filled + n] = block[:n]
+                    filled += n
+                    block = block[n:]
+
+                    if filled == self.flush_frames:
+                        f.write(buffer)
+                        filled = 0
+
+            if filled:
+                f.write(buffer[:filled])
+
+        except Exception as e:
+            print(f"⚠️ Recording error ({f.name}): {e}")
+
+            # keep taking blocks so write() / close() never hang
+            while q.get() is not None:
+                pass
+
+        finally:
+            f.close()
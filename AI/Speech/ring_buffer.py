@@ -0,0 +1,85 @@
+import numpy as np
+
+
+class BlockRing:
+    """
+    Lock-free single-producer / single-consumer ring of audio blocks,
+    for handing samples from the PortAudio callback to a worker thread.
+
+    All memory is allocated up front. push() only copies into the next
+    free slot, so the real-time callback never allocates, blocks or
+    waits on the consumer. The two counters only ever grow and each has
+    one writer: the producer publishes a slot by bumping write_index
+    after the copy, the consumer frees it by bumping read_index after
+    it is done reading. Under the GIL those stores are atomic and stay
+    in program order, which is all a SPSC ring needs.
+    """
+
+    def __init__(self, blocks, block_size, channels=1, dtype=np.float32):
+
+        self.capacity = blocks
+        self.block_size = block_size
+
+        self.data = np.zeros((blocks, block_size, channels), dtype=dtype)
+        self.frames = np.zeros(blocks, dtype=np.int64)     # valid frames per slot
+        self.times = np.zeros(blocks, dtype=np.float64)    # capture time per slot
+
+        self.write_index = 0    # producer only
+        self.read_index = 0     # consumer only
+
+        self.dropped = 0        # blocks pushed while full (producer only)
+
+    def __len__(self):
+        return self.write_index - self.read_index
+
+    # ---------- producer ----------
+
+    def push(self, block, timestamp=0.0):
+        """
+        Copy one (frames, channels) block into the ring. Returns False
+        and drops the block if the consumer is a full ring behind.
+        """
+
+        w = self.write_index
+
+        if w - self.read_index >= self.capacity:
+            self.dropped += 1
+            return False
+
+        slot = w % self.capacity
+        n = min(len(block), self.block_size)
+
+        self.data[slot, :n] = block[:n]
+        self.frames[slot] = n
+        self.times[slot] = timestamp
+
+        self.write_index = w + 1
+        return True
+
+    # ---------- consumer ----------
+
+    def peek(self):
+        """
+        (block view, timestamp) of the oldest unread block, or None.
+        The view stays valid until release().
+        """
+
+        r = self.read_index
+
+        if r == self.write_index:
+            return None
+
+        slot = r % self.capacity
+
+        return self.data[slot, :self.frames[slot]], float(self.times[slot])
+
+    def release(self):
+        self.read_index += 1
+
+    def clear(self):
+        """
+        Drop everything unread. Only while the producer is stopped.
+        """
+
+        self.read_index = self.write_index
+        self.dropped = 0
@@ -943,14 +943,17 @@
 
 import sys
 from pathlib import Path
-from fastapi import FastAPI, UploadFile, File, Depends
+from fastapi import FastAPI, UploadFile, File, Depends, Body, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from typing import Optional
+import asyncio
 import tempfile
 import time
 
-from database import get_db
+from database import get_db, SessionLocal
 from models.session import Session as SessionModel
 from models.feedback import Feedback
 from models.tutorial_video import TutorialVideo
@@ -978,11 +981,18 @@ sys.path.append(str(BASE / "Speech"))
 # ----------------------------
 
 from camera_server import (
-    process_frame_from_webrtc,
+    submit_frame,
+    busy_result,
     compute_scores,
     reset_scores,
+    end_session,
+    get_score_stats,
+    get_duplicate_stats,
+    set_decode_mode,
 )
 
+from offline_analyzer import analyze_recording
+
 from main_server import (
     start_speech_system,
     stop_speech_system,
@@ -1036,12 +1046,22 @@ running = False
 current_session_id = None
 current_user_id = None
 session_video_urls = {}
+RECORDINGS_DIR = BASE / "recordings"
 gemini_cache = {}  # Cache Gemini results to avoid re-running on poll
 
 # ----------------------------
 # HELPER
 # ----------------------------
 
+def blend_overall(vision_overall, speech_score):
+    """
+    Session overall score from the vision and speech scores; shared by
+    /api/stop and offline re-scoring.
+    """
+
+    return round(vision_overall * 0.65 + speech_score * 0.35, 1)
+
+
 def compute_overall(vision, filler_pct, pitch_stats):
 
     pitch_penalty = 0
@@ -1053,12 +1073,7 @@ def compute_overall(vision, filler_pct, pitch_stats):
         40,
     )
 
-    overall = round(
-        vision["overall"] * 0.65 + speech_score * 0.35,
-        1,
-    )
-
-    return speech_score, overall
+    return speech_score, blend_overall(vision["overall"], speech_score)
 
 # ----------------------------
 # START SESSION
@@ -1072,8 +1087,6 @@ def start(user_id: int = 1, db: Session = Depends(get_db)):
     if running:
         return {"status": "already running", "session_id": current_session_id}
 
-    reset_scores()
-    start_speech_system()
     gemini_cache.clear()  # Clear cached Gemini results for new session
 
     session = SessionModel(
@@ -1089,6 +1102,11 @@ def start(user_id: int = 1, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(session)
 
+    reset_scores(session.id)
+
+    # after the insert: the audio file is named after the session id
+    start_speech_system(session.id)
+
     current_session_id = session.id
     current_user_id = user_id
     running = True
@@ -1101,31 +1119,153 @@ def start(user_id: int = 1, db: Session = Depends(get_db)):
 # FRAME ANALYSIS
 # ----------------------------
 
+def save_frame_feedback(db: Session, session_id, result: dict):
+
+    if not session_id:
+        return
+
+    fb = Feedback(
+        session_id=session_id,
+        category="vision",
+        status="analyzed",
+        score=result.get("posture_score", 0),
+        timestamp=time.time(),
+    )
+    db.add(fb)
+    db.commit()
+
+
+def record_frame_feedback(session_id, result: dict):
+    """
+    Runs in the threadpool, so it opens its own DB session.
+    """
+
+    db = SessionLocal()
+    try:
+        save_frame_feedback(db, session_id, result)
+    finally:
+        db.close()
+
+
+async def analyze_frame(frame, session_id):
+    """
+    Hand the frame (base64 text or raw bytes) to the vision workers'
+    own bounded queue and await it without holding a threadpool
+    thread. When the queue is full, answer right away with the last
+    result flagged "busy" and skip the feedback row. Either way the
+    result has next_frame_ms for the client to pace itself.
+    """
+
+    future = submit_frame(frame, session_id)
+    if future is None:
+        return busy_result(session_id)
+
+    result = await asyncio.wrap_future(future)
+    await run_in_threadpool(record_frame_feedback, session_id, result)
+
+    return result
+
+
 @app.post("/api/frame")
-def receive_frame(payload: dict, db: Session = Depends(get_db)):
+async def receive_frame(payload: dict):
 
     frame = payload.get("frame")
-    session_id = payload.get("session_id")
+    session_id = payload.get("session_id") or current_session_id
 
     if not frame:
         return {"error": "No frame provided"}
 
-    result = process_frame_from_webrtc(frame)
+    return await analyze_frame(frame, session_id)
 
-    if session_id:
-        timestamp = time.time()
 
-        fb = Feedback(
-            session_id=session_id,
-            category="vision",
-            status="analyzed",
-            score=result.get("posture_score", 0),
-            timestamp=timestamp,
-        )
-        db.add(fb)
-        db.commit()
+@app.post("/api/frame/raw")
+async def receive_frame_raw(
+    frame: bytes = Body(b"", media_type="image/jpeg"),
+    session_id: Optional[int] = None,
+):
+    """
+    Binary variant of /api/frame: the request body is the encoded
+    JPEG / WebP image itself (Content-Type: image/jpeg or image/webp),
+    session_id goes in the query string. Skips JSON parsing and the
+    base64 round-trip; the response schema is identical.
+    """
 
-    return result
+    if not frame:
+        return {"error": "No frame provided"}
+
+    session_id = session_id or current_session_id
+
+    return await analyze_frame(frame, session_id)
+
+# ----------------------------
+# FRAME STREAM (WEBSOCKET)
+# ----------------------------
+
+
+@app.websocket("/ws/frame/{session_id}")
+async def frame_stream(websocket: WebSocket, session_id: int):
+    """
+    Streaming variant of /api/frame. The client sends frames as fast as
+    it likes; only the newest unprocessed frame is kept, older ones are
+    dropped, so a slow inference pass never builds up a backlog.
+    Each processed frame is answered with the /api/frame result plus
+    the number of frames dropped so far. Like /api/frame, every answer
+    carries next_frame_ms: the send interval the server recommends for
+    its current load and the scene's motion.
+    """
+
+    await websocket.accept()
+
+    pending = {"frame": None, "dropped": 0}
+    frame_ready = asyncio.Event()
+
+    async def process_latest():
+
+        while True:
+            await frame_ready.wait()
+            frame_ready.clear()
+
+            frame = pending["frame"]
+            pending["frame"] = None
+
+            # binary messages are raw JPEG / WebP, text messages base64
+            try:
+                result = await analyze_frame(frame, session_id)
+            except Exception as e:
+                # never leave the client on an open socket that stopped
+                # answering: close it so it can reconnect or give up
+                print(f"❌ Frame stream {session_id} failed: {e}")
+                await websocket.close(code=1011, reason="frame analysis failed")
+                return
+
+            if result.get("busy"):
+                pending["dropped"] += 1
+
+            result["dropped"] = pending["dropped"]
+
+            await websocket.send_json(result)
+
+    worker = asyncio.create_task(process_latest())
+
+    try:
+        while True:
+            message = await websocket.receive()
+
+            if message["type"] == "websocket.disconnect":
+                break
+
+            frame = message.get("bytes") or message.get("text")
+            if not frame:
+                continue
+
+            # latest frame wins: overwrite anything not yet picked up
+            if pending["frame"] is not None:
+                pending["dropped"] += 1
+
+            pending["frame"] = frame
+            frame_ready.set()
+    finally:
+        worker.cancel()
 
 # ----------------------------
 # STOP SESSION (Gemini runs in background thread)
@@ -1133,6 +1273,13 @@ def receive_frame(payload: dict, db: Session = Depends(get_db)):
 
 import threading
 
+# offline re-scores by session id. Either thread may finish first, so
+# analysis_json is only written under the lock and a Gemini result
+# saved after a re-score takes the re-scored values.
+rescored_sessions = {}
+analysis_lock = threading.Lock()
+
+
 def run_gemini_analysis_background(session_id: int, user_id: int, transcript: str, 
                                     reference_script_content: str, vision_scores: dict, 
                                     pitch_stats: dict, filler_pct: float, speech_score: float, 
@@ -1204,20 +1351,26 @@ def run_gemini_analysis_background(session_id: int, user_id: int, transcript: st
         from database import SessionLocal
         db = SessionLocal()
         try:
-            session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
-            if session:
-                session.analysis_json = analysis_result
-                db.commit()
-                print(f"✅ [Background] Session {session_id} analysis saved to database")
-            else:
-                print(f"⚠️ [Background] Session {session_id} not found in database")
+            with analysis_lock:
+                analysis_result.update(rescored_sessions.get(session_id, {}))
+
+                session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+                if session:
+                    session.analysis_json = analysis_result
+                    db.commit()
+                    print(f"✅ [Background] Session {session_id} analysis saved to database")
+                else:
+                    print(f"⚠️ [Background] Session {session_id} not found in database")
         finally:
             db.close()
     except Exception as e:
         print(f"⚠️ [Background] Failed to save to database: {e}")
     
     # Also update cache for immediate access
-    gemini_cache["analysis_result"] = analysis_result
+    with analysis_lock:
+        analysis_result.update(rescored_sessions.get(session_id, {}))
+        gemini_cache["session_id"] = session_id
+        gemini_cache["analysis_result"] = analysis_result
     print(f"✅ [Background] Gemini analysis complete for session {session_id}")
 
 
@@ -1235,7 +1388,8 @@ def stop(user_id: int = 1, db: Session = Depends(get_db)):
     # Get transcript and metrics
     transcript = get_full_transcript()
     pitch_stats = get_pitch_stats()
-    vision_scores = compute_scores()
+    vision_scores = compute_scores(current_session_id)
+    end_session(current_session_id)
 
     filler_count = len(speech_state.get("fillers", []))
     total_words = max(len(transcript.split()) if transcript else 1, 1)
@@ -1299,6 +1453,7 @@ def stop(user_id: int = 1, db: Session = Depends(get_db)):
     else:
         print(f"⏭️ Skipping Gemini analysis - transcript too short")
         # Set default analysis for short transcripts
+        gemini_cache["session_id"] = current_session_id
         gemini_cache["analysis_result"] = {
             "transcript": transcript,
             "fillers": speech_state.get("fillers", []),
@@ -1325,6 +1480,36 @@ def stop(user_id: int = 1, db: Session = Depends(get_db)):
 
     return {"status": "stopped", "session_id": current_session_id}
 
+# ----------------------------
+# VISION STATS (tuning)
+# ----------------------------
+
+@app.get("/api/vision/stats")
+def get_vision_stats(session_id: Optional[int] = None):
+    session_id = session_id or current_session_id
+    return {
+        "session_id": session_id,
+        "scores": get_score_stats(session_id),
+        "duplicates": get_duplicate_stats(session_id),
+    }
+
+
+@app.post("/api/vision/decode")
+def set_vision_decode(payload: dict):
+    """
+    {"mode": "full" | "auto" | 2 | 4 | 8, "session_id": optional}.
+    Clients sending large JPEGs can have them decoded reduced.
+    """
+
+    session_id = payload.get("session_id") or current_session_id
+
+    try:
+        mode = set_decode_mode(payload.get("mode", "auto"), session_id)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    return {"session_id": session_id, "decode_mode": mode}
+
 # ----------------------------
 # LIVE TRANSCRIPTS
 # ----------------------------
@@ -1387,10 +1572,15 @@ async def upload_video_file(file: UploadFile = File(...)):
             session_video_urls[current_session_id] = cloud_url
             print(f"\u2705 Session {current_session_id} video: {cloud_url}")
 
-        # Clean up temp file
+        # Keep a local copy for offline re-analysis, otherwise clean up
         import os
+        import shutil
         try:
-            os.unlink(temp_path)
+            if current_session_id:
+                os.makedirs(RECORDINGS_DIR, exist_ok=True)
+                shutil.move(temp_path, session_recording_path(current_session_id))
+            else:
+                os.unlink(temp_path)
         except:
             pass
 
@@ -1401,6 +1591,99 @@ async def upload_video_file(file: UploadFile = File(...)):
         traceback.print_exc()
         return JSONResponse(status_code=500, content={"video_url": None, "error": str(e)})
 
+# ----------------------------
+# OFFLINE RE-ANALYSIS
+# ----------------------------
+
+def session_recording_path(session_id):
+    return RECORDINGS_DIR / f"session_{session_id}.webm"
+
+
+def run_offline_analysis_background(session_id: int, video_path: str):
+    """
+    Re-score a stored recording off the live path and replace the
+    session's vision scores and vision feedback timeline.
+    """
+
+    print(f"🎞️ [Background] Offline analysis for session {session_id}...")
+
+    try:
+        report = analyze_recording(video_path)
+    except Exception as e:
+        print(f"⚠️ [Background] Offline analysis failed: {e}")
+        return
+
+    vision_scores = report["scores"]
+
+    db = SessionLocal()
+    try:
+        with analysis_lock:
+            session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+            if not session:
+                print(f"⚠️ [Background] Session {session_id} not found in database")
+                return
+
+            session.gesture_score = vision_scores["gesture"]
+            session.posture_score = vision_scores["posture"]
+            session.eye_score = vision_scores["eye"]
+            session.overall_score = blend_overall(vision_scores["overall"], session.speech_score or 0)
+
+            # session_report reads both from analysis_json first, then
+            # from the cache, which short-transcript sessions only have
+            rescored = {"vision_scores": vision_scores, "overall_score": session.overall_score}
+            rescored_sessions[session_id] = rescored
+
+            cached = None
+            if gemini_cache.get("session_id") == session_id:
+                cached = gemini_cache.get("analysis_result")
+            if cached:
+                gemini_cache["analysis_result"] = {**cached, **rescored}
+
+            session.analysis_json = {**(session.analysis_json or cached or {}), **rescored}
+
+            # same rows the live /api/frame path writes, one per timeline entry
+            start = session.created_at.timestamp() if session.created_at else time.time()
+
+            db.query(Feedback).filter(
+                Feedback.session_id == session_id,
+                Feedback.category == "vision",
+            ).delete()
+
+            for entry in report["timeline"]:
+                db.add(Feedback(
+                    session_id=session_id,
+                    category="vision",
+                    status="analyzed",
+                    score=entry["posture_score"],
+                    timestamp=start + entry["time"],
+                ))
+
+            db.commit()
+            print(f"✅ [Background] Session {session_id} re-scored: {vision_scores}")
+    finally:
+        db.close()
+
+
+@app.post("/api/sessions/{session_id}/reanalyze")
+def reanalyze_session(session_id: int):
+
+    video_path = session_recording_path(session_id)
+
+    if not video_path.exists():
+        return JSONResponse(
+            status_code=404,
+            content={"error": "No local recording for this session"},
+        )
+
+    thread = threading.Thread(
+        target=run_offline_analysis_background,
+        args=(session_id, str(video_path)),
+        daemon=True,
+    )
+    thread.start()
+
+    return {"status": "started", "session_id": session_id}
+
 # ----------------------------
 # FINAL SESSION REPORT (READ-ONLY - No Gemini calls)
 # ----------------------------
@@ -1467,7 +1750,7 @@ def session_report(
     
     # Get live data as fallback
     transcript = get_full_transcript()
-    vision_scores = compute_scores()
+    vision_scores = compute_scores(current_session_id)
     pitch_stats = get_pitch_stats()
     
     filler_count = len(speech_state.get("fillers", []))